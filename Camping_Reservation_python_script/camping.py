@@ -286,6 +286,43 @@ def remove_comments(lines: List[str]) -> List[str]:
     return new_lines
 
 
+def search(
+    start_date, end_date, parks, nights=None, campsite_type=None, campsite_ids=(), weekends_only=False, excluded_site_ids=[],
+):
+    """
+    In-process entry point for callers that want structured results instead
+    of the human readable output printed by `main`.
+
+    The output of this function looks like this:
+
+    {"<park_name> (<park_id>)": {"<site_id>": [(<start>, <end>), ...]}}
+
+    Only parks with at least one available site are included, mirroring the
+    success lines of `generate_human_output`.
+    """
+    results = {}
+    for park_id in parks:
+        current, _, available_dates_by_site_id, park_name = check_park(
+            park_id,
+            start_date,
+            end_date,
+            campsite_type,
+            campsite_ids,
+            nights=nights,
+            weekends_only=weekends_only,
+            excluded_site_ids=excluded_site_ids,
+        )
+        if not current:
+            continue
+
+        results["{} ({})".format(park_name, park_id)] = {
+            str(site_id): [(date["start"], date["end"]) for date in dates]
+            for site_id, dates in available_dates_by_site_id.items()
+        }
+
+    return results
+
+
 def main(parks, json_output=False):
     excluded_site_ids = []
 
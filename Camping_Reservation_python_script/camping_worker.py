@@ -0,0 +1,36 @@
+"""
+Long-lived search worker for callers that would otherwise spawn
+camping_wrapper.py once per search.
+
+Reads one JSON request per line on stdin:
+
+{"start_date": "2025-08-01", "end_date": "2025-08-05", "parks": ["232447"], "nights": 2}
+
+and writes one JSON line per request on stdout, in the same shape as
+`camping_wrapper.py --json-output` (or {"error": "..."}). Imports and
+module-level caches are paid for once per process instead of once per search.
+"""
+
+import json
+import sys
+
+import camping_wrapper
+
+
+def handle_request(line):
+    try:
+        return camping_wrapper.run_search(**json.loads(line))
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def main():
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        sys.stdout.write(camping_wrapper.JSON_ENCODER.encode(handle_request(line)) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
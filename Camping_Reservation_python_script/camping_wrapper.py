@@ -1,204 +1,240 @@
-import subprocess
-import sys
-import os
 import argparse
+import io
 import json as json_module
-from datetime import datetime, timedelta
+import sys
+from collections import defaultdict
+from datetime import datetime
+from functools import lru_cache
+
+import camping
+from enums.emoji import Emoji
 
-# Resolve camping.py path relative to this script
-SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-CAMPING_PY = os.path.join(SCRIPT_DIR, "camping.py")
+# Compact separators keep the --json-output payload small
+JSON_ENCODER = json_module.JSONEncoder(separators=(",", ":"))
+
+@lru_cache(maxsize=4096)
+def _parse_date(date_str):
+    # Date strings repeat heavily across sites in a park, so parse each once.
+    # Every date here is YYYY-MM-DD, which fromisoformat handles without
+    # going through strptime's format parser.
+    return datetime.fromisoformat(date_str)
 
 def run_camping_script(args):
-    # Prepare the command
-    command = [
-        sys.executable, CAMPING_PY,
-        "--start-date", args.start_date,
-        "--end-date", args.end_date,
-        "--parks", *args.parks,
-        "--nights", str(args.nights),
-        "--show-campsite-info",
-    ]
-
-    # Run the script
-    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-    if result.returncode != 0:
-        raise RuntimeError(f"Error running camping.py: {result.stderr}")
-
-    return result.stdout
+    # Run the search in-process and get back {park: {site_id: [(start, end), ...]}}
+    return camping.search(
+        _parse_date(args.start_date),
+        _parse_date(args.end_date),
+        args.parks,
+        nights=args.nights,
+    )
+
+def run_search(start_date, end_date, parks, nights):
+    """Run a search and return the same structure --json-output prints.
+
+    Raises ValueError for park IDs that aren't plain digits or nights < 1,
+    the checks the command line's argparse types used to make.
+    """
+    parks = [str(park_id) for park_id in parks]
+    bad_parks = [park_id for park_id in parks if not (park_id.isascii() and park_id.isdigit())]
+    if bad_parks:
+        raise ValueError(f"Invalid park ID(s): {', '.join(bad_parks)}")
+    nights = int(nights)
+    if nights < 1:
+        raise ValueError("nights must be a positive integer")
+
+    parsed_data = camping.search(
+        _parse_date(start_date), _parse_date(end_date), parks, nights=nights,
+    )
+    return build_json_output(*filter_by_days(parsed_data, nights))
+
+PARK_PREFIX = Emoji.SUCCESS.value
+SITE_PREFIX = "* Site "
+DATE_PREFIX = "* 202"
 
 def parse_camping_output(output):
-    # Parse the output of camping.py
+    # Parse the human readable output of camping.py (legacy, run_camping_script
+    # now returns this structure directly)
     parsed_data = {}
-    lines = output.splitlines()
     current_park = None
-    for line in lines:
+    site_id = None
+    # Iterate lazily rather than materialising every line with splitlines()
+    for line in io.StringIO(output):
         line = line.strip()
-        if line.startswith("🏕"):
-            park_info = line.split(":")[0]
-            current_park = park_info.replace("🏕", "").strip()
-            parsed_data[current_park] = {}
-        elif line.startswith("* Site"):
-            site_id = line.split()[2]
+        if line.startswith(DATE_PREFIX):
+            if site_id is None:
+                # Date line with no site above it in this park
+                continue
+            start, _, end = line[2:].partition(" -> ")
+            parsed_data[current_park][site_id].append((start, end.rstrip("* ")))
+        elif line.startswith(SITE_PREFIX):
+            site_id = line[len(SITE_PREFIX):].partition(" ")[0]
             parsed_data[current_park][site_id] = []
-        elif line.startswith("* 202"):
-            date_range = line.strip("* ").split(" -> ")
-            parsed_data[current_park][site_id].append(tuple(date_range))
+        elif line.startswith(PARK_PREFIX):
+            current_park = line[len(PARK_PREFIX):].partition(":")[0].strip()
+            parsed_data[current_park] = {}
+            site_id = None
     return parsed_data
 
+def _classify(min_nights, start_dow, end_dow):
+    # Logic for 1-night stays
+    if min_nights == 1:
+        if start_dow in (4, 5):  # Friday or Saturday
+            return "priority"
+        if start_dow in (3, 6):  # Thursday or Sunday
+            return "regular"
+        return "ignored"
+
+    # Logic for 2-night stays
+    if min_nights == 2:
+        if start_dow == 4:  # Fri and Sat
+            return "priority"
+        if start_dow in (3, 4, 5, 6) and end_dow in (5, 6, 0):  # Thurs-Sun or ends on Mon
+            return "regular"
+        return "ignored"
+
+    # Logic for 3-night stays
+    if min_nights == 3:
+        if start_dow in (3, 4):  # Thurs or Fri
+            return "priority"
+        return "ignored"
+
+    # Logic for 4-night stays
+    if min_nights == 4:
+        if start_dow == 3:  # Starts on Thurs
+            return "priority"
+        return "ignored"
+
+    # Logic for 5 or more nights (everything is priority)
+    return "priority"
+
+# (min_nights capped at 5, start weekday, end weekday) -> result bucket, built
+# once so filter_by_days does a single lookup per date range
+CLASSIFY = {
+    (nights, start_dow, end_dow): _classify(nights, start_dow, end_dow)
+    for nights in range(1, 6)
+    for start_dow in range(7)
+    for end_dow in range(7)
+}
+
+def _new_results():
+    # bucket -> park -> {range_key: count}; a park only appears in a bucket
+    # once a range lands in it
+    return {
+        "priority": defaultdict(lambda: defaultdict(int)),
+        "regular": defaultdict(lambda: defaultdict(int)),
+        "ignored": defaultdict(lambda: defaultdict(int)),
+    }
+
 def filter_by_days(parsed_data, min_nights):
-    priority_results = {}
-    regular_results = {}
-    ignored_results = {}
+    results = _new_results()
+    nights_key = min_nights if 1 <= min_nights <= 4 else 5
 
     for park, sites in parsed_data.items():
-        park_priority = {}
-        park_regular = {}
-        park_ignored = {}
         for site_id, date_ranges in sites.items():
             for date_range in date_ranges:
-                start_date = datetime.strptime(date_range[0], "%Y-%m-%d")
-                end_date = datetime.strptime(date_range[1], "%Y-%m-%d")
-                num_nights = (end_date - start_date).days
+                start_date = _parse_date(date_range[0])
+                end_date = _parse_date(date_range[1])
+                if (end_date - start_date).days < min_nights:
+                    continue
 
                 range_key = format_date_range(date_range[0], date_range[1])
-
-                if num_nights < min_nights:
+                if nights_key == 5:
+                    # 5 or more nights are always priority, no weekdays needed
+                    results["priority"][park][range_key] += 1
                     continue
 
-                # Logic for 1-night stays (no changes)
-                if min_nights == 1:
-                    if start_date.weekday() in [4, 5]:  # Friday or Saturday
-                        if range_key not in park_priority:
-                            park_priority[range_key] = 0
-                        park_priority[range_key] += 1
-                    elif start_date.weekday() in [3, 6]:  # Thursday or Sunday
-                        if range_key not in park_regular:
-                            park_regular[range_key] = 0
-                        park_regular[range_key] += 1
-                    else:
-                        if range_key not in park_ignored:
-                            park_ignored[range_key] = 0
-                        park_ignored[range_key] += 1
-
-                # Logic for 2-night stays (no changes)
-                elif min_nights == 2:
-                    if start_date.weekday() == 4 and (start_date + timedelta(days=1)).weekday() == 5:  # Fri and Sat
-                        if range_key not in park_priority:
-                            park_priority[range_key] = 0
-                        park_priority[range_key] += 1
-                    elif (
-                        start_date.weekday() in [3, 4, 5, 6]
-                        and end_date.weekday() in [5, 6, 0]
-                    ):  # Thurs-Sun or ends on Mon
-                        if range_key not in park_regular:
-                            park_regular[range_key] = 0
-                        park_regular[range_key] += 1
-                    else:
-                        if range_key not in park_ignored:
-                            park_ignored[range_key] = 0
-                        park_ignored[range_key] += 1
-
-                # Logic for 3-night stays
-                elif min_nights == 3:
-                    if start_date.weekday() in [3, 4]:  # Thurs or Fri
-                        if range_key not in park_priority:
-                            park_priority[range_key] = 0
-                        park_priority[range_key] += 1
-                    else:
-                        if range_key not in park_ignored:
-                            park_ignored[range_key] = 0
-                        park_ignored[range_key] += 1
-
-                # Logic for 4-night stays
-                elif min_nights == 4:
-                    if start_date.weekday() == 3:  # Starts on Thurs
-                        if range_key not in park_priority:
-                            park_priority[range_key] = 0
-                        park_priority[range_key] += 1
-                    else:
-                        if range_key not in park_ignored:
-                            park_ignored[range_key] = 0
-                        park_ignored[range_key] += 1
-
-                # Logic for 5 or more nights (everything is priority)
-                else:
-                    if range_key not in park_priority:
-                        park_priority[range_key] = 0
-                    park_priority[range_key] += 1
-
-        priority_results[park] = park_priority
-        regular_results[park] = park_regular
-        ignored_results[park] = park_ignored
-
-    return priority_results, regular_results, ignored_results
+                start_dow = start_date.weekday()
+                end_dow = end_date.weekday()
+                results[CLASSIFY[(nights_key, start_dow, end_dow)]][park][range_key] += 1
 
+    return results["priority"], results["regular"], results["ignored"]
 
+
+# Weekday abbreviations indexed by datetime.weekday(), same as strftime('%a')
+DOW_ABBR = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+@lru_cache(maxsize=4096)
 def format_date_range(start, end):
-    start_date = datetime.strptime(start, "%Y-%m-%d")
-    end_date = datetime.strptime(end, "%Y-%m-%d")
-    start_str = f"{start} ({start_date.strftime('%a')})"
-    end_str = f"{end} ({end_date.strftime('%a')})"
+    start_str = f"{start} ({DOW_ABBR[_parse_date(start).weekday()]})"
+    end_str = f"{end} ({DOW_ABBR[_parse_date(end).weekday()]})"
     return f"{start_str} -> {end_str}"
 
 def display_results(priority_results, regular_results, ignored_results):
+    # Collect every line and write once instead of one print() per row
+    lines = []
     for park, date_ranges in priority_results.items():
-        print(f"🏕 {park}")
-        print("  **Priority Results:**")
+        lines.append(f"🏕 {park}")
+        lines.append("  **Priority Results:**")
         for date_range, site_count in date_ranges.items():
-            print(f"  \033[1m{date_range} --> {site_count} site(s) available\033[0m")  # Bold text
+            lines.append(f"  \033[1m{date_range} --> {site_count} site(s) available\033[0m")  # Bold text
 
     for park, date_ranges in regular_results.items():
-        print(f"🏕 {park}")
-        print("  **Regular Results:**")
+        lines.append(f"🏕 {park}")
+        lines.append("  **Regular Results:**")
         for date_range, site_count in date_ranges.items():
-            print(f"  {date_range} --> {site_count} site(s) available")
+            lines.append(f"  {date_range} --> {site_count} site(s) available")
 
     for park, date_ranges in ignored_results.items():
-        print(f"🏕 {park}")
-        print("  **Ignored Results:**")
+        lines.append(f"🏕 {park}")
+        lines.append("  **Ignored Results:**")
         for date_range, site_count in date_ranges.items():
-            print(f"  {date_range} --> {site_count} site(s) available")
+            lines.append(f"  {date_range} --> {site_count} site(s) available")
+
+    if lines:
+        lines.append("")
+        sys.stdout.write("\n".join(lines))
 
 
 def build_json_output(priority_results, regular_results, ignored_results):
     """Build structured JSON output keyed by park name."""
-    result = {}
-    # Collect all park names across all result dicts
-    all_parks = set(list(priority_results.keys()) + list(regular_results.keys()) + list(ignored_results.keys()))
-    for park in all_parks:
-        result[park] = {
-            "priority": priority_results.get(park, {}),
-            "regular": regular_results.get(park, {}),
-            "ignored": ignored_results.get(park, {}),
+    # Collect all park names across all result dicts (set union of the key views)
+    all_parks = priority_results.keys() | regular_results.keys() | ignored_results.keys()
+    return {
+        park: {
+            "priority": dict(priority_results.get(park, {})),
+            "regular": dict(regular_results.get(park, {})),
+            "ignored": dict(ignored_results.get(park, {})),
         }
-    return result
+        for park in all_parks
+    }
 
 
-if __name__ == "__main__":
-    # Parse command-line arguments
-    parser = argparse.ArgumentParser(description="Wrapper for camping.py")
-    parser.add_argument("--start-date", required=True, help="Start date in YYYY-MM-DD format")
-    parser.add_argument("--end-date", required=True, help="End date in YYYY-MM-DD format")
-    parser.add_argument("--parks", required=True, nargs="+", help="List of park IDs")
-    parser.add_argument("--nights", type=int, required=True, help="Minimum number of nights required")
-    parser.add_argument("--show-campsite-info", action="store_true", help="Show detailed campsite info")
-    parser.add_argument("--json-output", action="store_true", help="Output results as JSON")
-
-    args = parser.parse_args()
+def main(args):
+    """Run a search and print the results.
 
+    `args` only needs start_date, end_date, parks, nights and json_output, so
+    programmatic callers can pass an argparse.Namespace (or any object with
+    those attributes) and skip building a parser.
+    """
     # Run camping.py and process its output
     try:
-        output = run_camping_script(args)
-        parsed_data = parse_camping_output(output)
+        parsed_data = run_camping_script(args)
         priority_results, regular_results, ignored_results = filter_by_days(parsed_data, args.nights)
         if args.json_output:
-            print(json_module.dumps(build_json_output(priority_results, regular_results, ignored_results)))
+            # Stream the encoded chunks rather than building one large string
+            sys.stdout.writelines(JSON_ENCODER.iterencode(build_json_output(priority_results, regular_results, ignored_results)))
+            sys.stdout.write("\n")
         else:
             display_results(priority_results, regular_results, ignored_results)
     except Exception as e:
         if args.json_output:
-            print(json_module.dumps({"error": str(e)}))
+            print(JSON_ENCODER.encode({"error": str(e)}))
         else:
             print(f"Error: {e}")
 
+
+def cli():
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser(description="Wrapper for camping.py")
+    parser.add_argument("--start-date", required=True, help="Start date in YYYY-MM-DD format")
+    parser.add_argument("--end-date", required=True, help="End date in YYYY-MM-DD format")
+    parser.add_argument("--parks", required=True, nargs="+", help="List of park IDs")
+    parser.add_argument("--nights", type=int, required=True, help="Minimum number of nights required")
+    parser.add_argument("--show-campsite-info", action="store_true", help="Show detailed campsite info")
+    parser.add_argument("--json-output", action="store_true", help="Output results as JSON")
+
+    main(parser.parse_args())
+
+
+if __name__ == "__main__":
+    cli()
@@ -17,6 +17,9 @@ class RecreationClient:
     MAIN_PAGE_ENDPOINT = BASE_URL + "/api/camps/campgrounds/{park_id}"
 
     headers = {"User-Agent": user_agent.generate_user_agent() }
+    # Seconds to wait on recreation.gov; without it a stalled connection
+    # hangs the caller (and the web worker running the search) forever
+    TIMEOUT = 30
     
     @classmethod
     def get_availability(cls, park_id, month_date):
@@ -37,7 +40,9 @@ class RecreationClient:
 
     @classmethod
     def _send_request(cls, url, params):
-        resp = requests.get(url, params=params, headers=cls.headers)
+        resp = requests.get(
+            url, params=params, headers=cls.headers, timeout=cls.TIMEOUT
+        )
         if resp.status_code != 200:
             raise RuntimeError(
                 "failedRequest",
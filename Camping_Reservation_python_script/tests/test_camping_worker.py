@@ -0,0 +1,47 @@
+import io
+import json
+import unittest
+from unittest.mock import patch
+
+import camping
+import camping_worker
+
+
+class TestCampingWorker(unittest.TestCase):
+    def testMain_AnswersEachRequestLine(self):
+        request = {
+            "start_date": "2022-06-24",
+            "end_date": "2022-06-26",
+            "parks": ["1"],
+            "nights": 1,
+        }
+        check_park_result = (
+            1,
+            3,
+            {18621: [{"start": "2022-06-24", "end": "2022-06-25"}]},
+            "SOME PARK",
+        )
+        stdin = io.StringIO(json.dumps(request) + "\n\n" + "not json\n")
+
+        with patch.object(camping, "check_park", return_value=check_park_result), \
+                patch("sys.stdin", stdin), \
+                patch("sys.stdout", new_callable=io.StringIO) as stdout:
+            camping_worker.main()
+
+        responses = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(
+            responses[0],
+            {
+                "SOME PARK (1)": {
+                    "priority": {"2022-06-24 (Fri) -> 2022-06-25 (Sat)": 1},
+                    "regular": {},
+                    "ignored": {},
+                }
+            },
+        )
+        self.assertIn("error", responses[1])
+        self.assertEqual(len(responses), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,269 @@
+import argparse
+import io
+import unittest
+from unittest.mock import patch
+
+import camping
+import camping_wrapper
+
+
+class TestCampingWrapper(unittest.TestCase):
+    def testRunCampingScript_ReturnsStructuredResultsForAvailableParks(self):
+        check_park_results = {
+            "1": (
+                2,
+                3,
+                {
+                    18621: [{"start": "2022-06-24", "end": "2022-06-25"}],
+                    18654: [
+                        {"start": "2022-06-24", "end": "2022-06-25"},
+                        {"start": "2022-06-25", "end": "2022-06-26"},
+                    ],
+                },
+                "SOME PARK",
+            ),
+            "2": (0, 5, {}, "OTHER PARK"),
+        }
+        args = argparse.Namespace(
+            start_date="2022-06-24",
+            end_date="2022-06-26",
+            parks=["1", "2"],
+            nights=1,
+        )
+
+        with patch.object(
+            camping,
+            "check_park",
+            side_effect=lambda park_id, *a, **kw: check_park_results[park_id],
+        ):
+            parsed_data = camping_wrapper.run_camping_script(args)
+
+        self.assertEqual(
+            parsed_data,
+            {
+                "SOME PARK (1)": {
+                    "18621": [("2022-06-24", "2022-06-25")],
+                    "18654": [
+                        ("2022-06-24", "2022-06-25"),
+                        ("2022-06-25", "2022-06-26"),
+                    ],
+                }
+            },
+        )
+
+    def testRunSearch_RejectsBadParkIdsAndNights(self):
+        with patch.object(camping, "search") as search:
+            with self.assertRaises(ValueError):
+                camping_wrapper.run_search("2022-06-24", "2022-06-26", ["1", "../2"], 1)
+            with self.assertRaises(ValueError):
+                camping_wrapper.run_search("2022-06-24", "2022-06-26", ["1"], 0)
+
+        search.assert_not_called()
+
+    def testMain_AcceptsNamespaceAndPrintsJson(self):
+        args = argparse.Namespace(
+            start_date="2022-06-24",
+            end_date="2022-06-26",
+            parks=["1"],
+            nights=1,
+            json_output=True,
+        )
+        check_park_result = (
+            1,
+            3,
+            {18621: [{"start": "2022-06-24", "end": "2022-06-25"}]},
+            "SOME PARK",
+        )
+
+        with patch.object(camping, "check_park", return_value=check_park_result), \
+                patch("sys.stdout", new_callable=io.StringIO) as stdout:
+            camping_wrapper.main(args)
+
+        self.assertEqual(
+            stdout.getvalue(),
+            '{"SOME PARK (1)":{"priority":{"2022-06-24 (Fri) -> 2022-06-25 (Sat)":1},'
+            '"regular":{},"ignored":{}}}\n',
+        )
+
+    def testParseCampingOutput_ParsesHumanOutput(self):
+        output = "\n".join(
+            [
+                "there are campsites available from 2022-06-01 to 2022-07-01!!!",
+                "🏕 SOME PARK (1): 2 site(s) available out of 3 site(s)",
+                "  * Site 18621 is available on the following dates:",
+                "    * 2022-06-22 -> 2022-06-23",
+                "    * 2022-06-24 -> 2022-06-26",
+                "❌ OTHER PARK (2): 0 site(s) available out of 3 site(s)",
+            ]
+        )
+
+        self.assertEqual(
+            camping_wrapper.parse_camping_output(output),
+            {
+                "SOME PARK (1)": {
+                    "18621": [
+                        ("2022-06-22", "2022-06-23"),
+                        ("2022-06-24", "2022-06-26"),
+                    ]
+                }
+            },
+        )
+
+    def testParseCampingOutput_SkipsDatesBeforeAnySite(self):
+        output = "\n".join(
+            [
+                "🏕 SOME PARK (1): 1 site(s) available out of 3 site(s)",
+                "    * 2022-06-22 -> 2022-06-23",
+                "  * Site 18621 is available on the following dates:",
+                "    * 2022-06-24 -> 2022-06-26",
+                "🏕 OTHER PARK (2): 1 site(s) available out of 3 site(s)",
+                "    * 2022-06-22 -> 2022-06-23",
+            ]
+        )
+
+        self.assertEqual(
+            camping_wrapper.parse_camping_output(output),
+            {
+                "SOME PARK (1)": {"18621": [("2022-06-24", "2022-06-26")]},
+                "OTHER PARK (2)": {},
+            },
+        )
+
+    def testFilterByDays_OneNightClassifiesByStartWeekday(self):
+        parsed_data = {
+            "SOME PARK (1)": {
+                "100": [
+                    ("2022-06-24", "2022-06-25"),  # Fri
+                    ("2022-06-26", "2022-06-27"),  # Sun
+                    ("2022-06-27", "2022-06-28"),  # Mon
+                ],
+                "101": [("2022-06-24", "2022-06-25")],
+            }
+        }
+
+        priority, regular, ignored = camping_wrapper.filter_by_days(
+            parsed_data, 1
+        )
+
+        self.assertEqual(
+            priority["SOME PARK (1)"],
+            {"2022-06-24 (Fri) -> 2022-06-25 (Sat)": 2},
+        )
+        self.assertEqual(
+            regular["SOME PARK (1)"],
+            {"2022-06-26 (Sun) -> 2022-06-27 (Mon)": 1},
+        )
+        self.assertEqual(
+            ignored["SOME PARK (1)"],
+            {"2022-06-27 (Mon) -> 2022-06-28 (Tue)": 1},
+        )
+
+    def testFilterByDays_TwoNightsClassifiesWeekendsAndSkipsShortRanges(self):
+        parsed_data = {
+            "SOME PARK (1)": {
+                "100": [
+                    ("2022-06-24", "2022-06-26"),  # Fri -> Sun
+                    ("2022-06-23", "2022-06-25"),  # Thu -> Sat
+                    ("2022-06-20", "2022-06-22"),  # Mon -> Wed
+                    ("2022-06-24", "2022-06-25"),  # too short
+                ],
+            }
+        }
+
+        priority, regular, ignored = camping_wrapper.filter_by_days(
+            parsed_data, 2
+        )
+
+        self.assertEqual(
+            priority["SOME PARK (1)"],
+            {"2022-06-24 (Fri) -> 2022-06-26 (Sun)": 1},
+        )
+        self.assertEqual(
+            regular["SOME PARK (1)"],
+            {"2022-06-23 (Thu) -> 2022-06-25 (Sat)": 1},
+        )
+        self.assertEqual(
+            ignored["SOME PARK (1)"],
+            {"2022-06-20 (Mon) -> 2022-06-22 (Wed)": 1},
+        )
+
+    def testFilterByDays_OmitsEmptyBuckets(self):
+        parsed_data = {
+            "SOME PARK (1)": {"100": [("2022-06-23", "2022-06-26")]},  # Thu
+            "SHORT PARK (2)": {"100": [("2022-06-23", "2022-06-24")]},
+        }
+
+        priority, regular, ignored = camping_wrapper.filter_by_days(
+            parsed_data, 3
+        )
+
+        self.assertEqual(
+            priority,
+            {"SOME PARK (1)": {"2022-06-23 (Thu) -> 2022-06-26 (Sun)": 1}},
+        )
+        self.assertEqual(regular, {})
+        self.assertEqual(ignored, {})
+
+    def testFilterByDays_FiveOrMoreNightsAreAlwaysPriority(self):
+        parsed_data = {
+            "SOME PARK (1)": {
+                "100": [
+                    ("2022-06-20", "2022-06-25"),  # Mon
+                    ("2022-06-22", "2022-06-28"),  # Wed, 6 nights
+                    ("2022-06-22", "2022-06-24"),  # too short
+                ],
+            }
+        }
+
+        priority, regular, ignored = camping_wrapper.filter_by_days(
+            parsed_data, 5
+        )
+
+        self.assertEqual(
+            priority["SOME PARK (1)"],
+            {
+                "2022-06-20 (Mon) -> 2022-06-25 (Sat)": 1,
+                "2022-06-22 (Wed) -> 2022-06-28 (Tue)": 1,
+            },
+        )
+        self.assertEqual(regular, {})
+        self.assertEqual(ignored, {})
+
+    def testDisplayResults_WritesAllSectionsInOrder(self):
+        expected = "\n".join(
+            [
+                "🏕 A (1)",
+                "  **Priority Results:**",
+                "  \033[1mr1 --> 1 site(s) available\033[0m",
+                "🏕 A (1)",
+                "  **Regular Results:**",
+                "  r2 --> 2 site(s) available",
+                "🏕 A (1)",
+                "  **Ignored Results:**",
+                "",
+            ]
+        )
+
+        with patch("sys.stdout", new_callable=io.StringIO) as stdout:
+            camping_wrapper.display_results(
+                {"A (1)": {"r1": 1}}, {"A (1)": {"r2": 2}}, {"A (1)": {}}
+            )
+
+        self.assertEqual(stdout.getvalue(), expected)
+
+    def testBuildJsonOutput_KeysEveryParkByCategory(self):
+        output = camping_wrapper.build_json_output(
+            {"A (1)": {"r1": 1}}, {"A (1)": {}, "B (2)": {"r2": 2}}, {}
+        )
+
+        self.assertEqual(
+            output,
+            {
+                "A (1)": {"priority": {"r1": 1}, "regular": {}, "ignored": {}},
+                "B (2)": {"priority": {}, "regular": {"r2": 2}, "ignored": {}},
+            },
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+"""
+DB migration: rebuild the search_history user/device indexes as covering indexes.
+
+PostgreSQL only (INCLUDE columns); other databases are left untouched.
+
+Run once:
+    PYTHONPATH=. python website/add_history_covering_indexes.py
+"""
+
+import os
+import sys
+from sqlalchemy import create_engine, inspect
+from dotenv import load_dotenv
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from website.models import SearchHistory
+
+load_dotenv()
+
+DATABASE_URI = os.environ.get("DATABASE_URI", "sqlite:///camping.db")
+engine = create_engine(DATABASE_URI)
+
+INDEXES = ["idx_user_created", "idx_device_created"]
+
+
+def run():
+    if engine.dialect.name != "postgresql":
+        print(f"  {engine.dialect.name} does not support INCLUDE columns — skipping")
+        return
+
+    if "search_history" not in inspect(engine).get_table_names():
+        print("  Table 'search_history' does not exist — skipping")
+        return
+
+    indexes = {ix.name: ix for ix in SearchHistory.__table__.indexes}
+    # engine.begin() swaps both indexes in one transaction
+    with engine.begin() as conn:
+        for name in INDEXES:
+            conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+            indexes[name].create(conn)
+            print(f"  Rebuilt {name}")
+
+    # VACUUM can't run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql("VACUUM ANALYZE search_history")
+        print("  Vacuumed and analyzed search_history")
+
+    print("Migration complete.")
+
+
+if __name__ == "__main__":
+    run()
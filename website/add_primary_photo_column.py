@@ -0,0 +1,62 @@
+"""
+DB migration: add ``primary_photo_url`` to campgrounds and backfill it from ``photos``.
+
+Run once:
+    PYTHONPATH=. python website/add_primary_photo_column.py
+"""
+
+import json
+import os
+import sys
+from sqlalchemy import create_engine, inspect, text
+from dotenv import load_dotenv
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from website.models import Campground
+
+load_dotenv()
+
+DATABASE_URI = os.environ.get("DATABASE_URI", "sqlite:///camping.db")
+engine = create_engine(DATABASE_URI)
+
+
+def run():
+    inspector = inspect(engine)
+    if "campgrounds" not in inspector.get_table_names():
+        print("  Table 'campgrounds' does not exist — skipping")
+        return
+
+    existing = [c["name"] for c in inspector.get_columns("campgrounds")]
+    # engine.begin() commits the ALTER and the backfill together
+    with engine.begin() as conn:
+        if "primary_photo_url" in existing:
+            print("  campgrounds.primary_photo_url already exists — skipping ALTER")
+        else:
+            conn.exec_driver_sql("ALTER TABLE campgrounds ADD COLUMN primary_photo_url VARCHAR(500)")
+            print("  Added campgrounds.primary_photo_url")
+
+        rows = conn.execute(text(
+            "SELECT id, photos FROM campgrounds "
+            "WHERE primary_photo_url IS NULL AND photos IS NOT NULL"
+        )).all()
+        updates = []
+        for row_id, photos in rows:
+            if isinstance(photos, str):
+                photos = json.loads(photos)
+            url = Campground.pick_primary_photo(photos)
+            if url:
+                updates.append({"id": row_id, "url": url})
+        if updates:
+            conn.execute(
+                text("UPDATE campgrounds SET primary_photo_url = :url WHERE id = :id"),
+                updates,
+            )
+        print(f"  Backfilled primary_photo_url for {len(updates)} campground(s)")
+
+    print("Migration complete.")
+
+
+if __name__ == "__main__":
+    run()
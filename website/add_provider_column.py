@@ -7,7 +7,7 @@ Run once:
 
 import os
 import sys
-from sqlalchemy import create_engine, text, inspect
+from sqlalchemy import create_engine, inspect
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -23,9 +23,11 @@ MIGRATIONS = [
 
 def run():
     inspector = inspect(engine)
-    with engine.connect() as conn:
+    tables = set(inspector.get_table_names())
+    # engine.begin() commits every ALTER together when the block exits
+    with engine.begin() as conn:
         for table, column, col_type, default in MIGRATIONS:
-            if table not in inspector.get_table_names():
+            if table not in tables:
                 print(f"  Table '{table}' does not exist — skipping")
                 continue
             existing = [c["name"] for c in inspector.get_columns(table)]
@@ -33,8 +35,7 @@ def run():
                 print(f"  {table}.{column} already exists — skipping")
                 continue
             sql = f"ALTER TABLE {table} ADD COLUMN {column} {col_type} DEFAULT {default}"
-            conn.execute(text(sql))
-            conn.commit()
+            conn.exec_driver_sql(sql)
             print(f"  Added {table}.{column}")
 
     print("Migration complete.")
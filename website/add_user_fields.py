@@ -6,26 +6,34 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from website.app import app
 from website.models import db
-from sqlalchemy import text
+from sqlalchemy import inspect
+
+USER_FIELDS = [
+    ("profile_picture", "VARCHAR(500)"),
+    ("language_preference", "VARCHAR(20)"),
+]
 
 def add_user_fields():
     """Add profile picture and language preference fields to the users table."""
     try:
         with app.app_context():
-            # Add profile_picture column
-            db.session.execute(text("ALTER TABLE users ADD COLUMN profile_picture VARCHAR(500);"))
-            print("Added profile_picture column to users table")
-            
-            # Add language_preference column
-            db.session.execute(text("ALTER TABLE users ADD COLUMN language_preference VARCHAR(20);"))
-            print("Added language_preference column to users table")
-            
-            # Commit the changes
-            db.session.commit()
+            # Only add columns that don't exist yet so the script is safe to re-run
+            existing = {c["name"] for c in inspect(db.engine).get_columns("users")}
+            missing = [(column, col_type) for column, col_type in USER_FIELDS if column not in existing]
+
+            if not missing:
+                print("users table already up to date")
+                return
+
+            # Apply all ALTERs in a single transaction
+            with db.engine.begin() as conn:
+                for column, col_type in missing:
+                    conn.exec_driver_sql(f"ALTER TABLE users ADD COLUMN {column} {col_type}")
+                    print(f"Added {column} column to users table")
+
             print("Database schema updated successfully")
     except Exception as e:
-        db.session.rollback()
         print(f"Error updating database schema: {e}")
 
 if __name__ == "__main__":
-    add_user_fields() 
\ No newline at end of file
+    add_user_fields() 
@@ -0,0 +1,60 @@
+"""
+DB migration: convert ``search_history.device_id`` from VARCHAR(64) to a UUID column.
+
+On PostgreSQL the column becomes a native ``uuid``; elsewhere SQLAlchemy's
+``Uuid`` type stores 32-char hex, so existing values are rewritten to that form.
+Values that are not valid UUIDs are cleared.
+
+Run once:
+    PYTHONPATH=. python website/add_uuid_device_id.py
+"""
+
+import os
+import uuid
+from sqlalchemy import create_engine, inspect, text
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DATABASE_URI = os.environ.get("DATABASE_URI", "sqlite:///camping.db")
+engine = create_engine(DATABASE_URI)
+
+UUID_PATTERN = "^[0-9a-fA-F]{8}-?([0-9a-fA-F]{4}-?){3}[0-9a-fA-F]{12}$"
+
+
+def run():
+    if "search_history" not in inspect(engine).get_table_names():
+        print("  Table 'search_history' does not exist — skipping")
+        return
+
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            conn.exec_driver_sql(
+                "ALTER TABLE search_history ALTER COLUMN device_id TYPE uuid USING "
+                f"CASE WHEN device_id ~ '{UUID_PATTERN}' THEN device_id::uuid END"
+            )
+            print("  Converted search_history.device_id to uuid")
+        else:
+            rows = conn.execute(text(
+                "SELECT DISTINCT device_id FROM search_history WHERE device_id IS NOT NULL"
+            )).scalars().all()
+            updates = []
+            for old in rows:
+                try:
+                    new = uuid.UUID(old).hex
+                except ValueError:
+                    new = None
+                if new != old:
+                    updates.append({"old": old, "new": new})
+            if updates:
+                conn.execute(
+                    text("UPDATE search_history SET device_id = :new WHERE device_id = :old"),
+                    updates,
+                )
+            print(f"  Rewrote {len(updates)} device_id value(s) as UUID hex")
+
+    print("Migration complete.")
+
+
+if __name__ == "__main__":
+    run()
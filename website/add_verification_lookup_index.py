@@ -0,0 +1,47 @@
+"""
+DB migration: add the ``idx_verification_lookup`` index to verification_codes.
+
+Safe to re-run; the index is only created if it is missing.
+
+Run once:
+    PYTHONPATH=. python website/add_verification_lookup_index.py
+"""
+
+import os
+import sys
+from sqlalchemy import create_engine, inspect
+from dotenv import load_dotenv
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from website.models import VerificationCode
+
+load_dotenv()
+
+DATABASE_URI = os.environ.get("DATABASE_URI", "sqlite:///camping.db")
+engine = create_engine(DATABASE_URI)
+
+INDEX = "idx_verification_lookup"
+
+
+def run():
+    inspector = inspect(engine)
+    if "verification_codes" not in inspector.get_table_names():
+        print("  Table 'verification_codes' does not exist — skipping")
+        return
+
+    if INDEX in {ix["name"] for ix in inspector.get_indexes("verification_codes")}:
+        print(f"  {INDEX} already exists — skipping")
+        return
+
+    index = next(ix for ix in VerificationCode.__table__.indexes if ix.name == INDEX)
+    with engine.begin() as conn:
+        index.create(conn)
+    print(f"  Created {INDEX}")
+
+    print("Migration complete.")
+
+
+if __name__ == "__main__":
+    run()
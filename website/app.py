@@ -1,20 +1,29 @@
-from flask import Flask, render_template, request, jsonify, flash, redirect, url_for, session, g
+from flask import Flask, render_template, request, jsonify, flash, redirect, url_for, session, g, has_app_context, has_request_context
+from flask.json.provider import DefaultJSONProvider
 import sys
 import os
-from datetime import datetime, timedelta
-import subprocess
+import atexit
+import queue
+import time
+from datetime import date, datetime
+from functools import lru_cache
 import logging
 from werkzeug.exceptions import HTTPException
 import traceback
 import re
 import requests
 from math import radians, sin, cos, sqrt, atan2
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import json
-import hashlib
+import orjson
 import uuid
+from collections import OrderedDict
+from operator import itemgetter
 from concurrent.futures import ThreadPoolExecutor
-from sqlalchemy import inspect
+from threading import Lock, Thread
+from sqlalchemy import event, insert, lambda_stmt, select
+from sqlalchemy.orm import undefer
+from apscheduler.events import EVENT_JOB_EXECUTED
 from dotenv import load_dotenv
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
@@ -29,21 +38,57 @@ from website.models import db, User, Subscription, Notification, Payment, Verifi
 from website.routes import register_routes
 from website.services import auth_service
 
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson.
+
+    Dates still go through ``default`` so they serialize exactly as with the
+    stdlib provider. Calls with extra ``json`` arguments (such as the
+    indented debug-mode responses) fall back to the stdlib implementation.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if kwargs.keys() - {'separators'}:
+            return super().dumps(obj, **kwargs)
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
+
+# Shared Redis instance for rate limits and the search cache; both fall
+# back to in-process memory for local development
+REDIS_URL = os.environ.get('REDIS_URL')
 
 # Initialize rate limiter
 limiter = Limiter(
     app=app,
     key_func=get_remote_address,
     default_limits=["200 per day", "50 per hour"],
-    storage_uri="memory://"
+    storage_uri=REDIS_URL or "memory://",
+    strategy="fixed-window"
 )
 
 # Initialize cache
-cache = Cache(app, config={
-    'CACHE_TYPE': 'SimpleCache',
-    'CACHE_DEFAULT_TIMEOUT': 300  # 5 minutes
-})
+if REDIS_URL:
+    cache = Cache(app, config={
+        'CACHE_TYPE': 'RedisCache',
+        'CACHE_REDIS_URL': REDIS_URL,
+        'CACHE_DEFAULT_TIMEOUT': 300  # 5 minutes
+    })
+else:
+    cache = Cache(app, config={
+        'CACHE_TYPE': 'SimpleCache',
+        'CACHE_DEFAULT_TIMEOUT': 300  # 5 minutes
+    })
 
 # Load configuration from environment variables
 MAPS_API_KEY = os.environ.get('MAPS_API_KEY')
@@ -56,6 +101,17 @@ app.config['SECRET_KEY'] = SECRET_KEY
 app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URI
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Connection pool for server databases (Postgres/MySQL). SQLite keeps
+# SQLAlchemy's default file pool.
+if not DATABASE_URI.startswith('sqlite'):
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 20)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 40)),
+        'pool_pre_ping': True,  # Drop connections the server closed while idle
+        'pool_recycle': 300,
+        'pool_use_lifo': True,  # Reuse the warmest connection; idle extras age out
+    }
+
 # Session security
 app.config['SESSION_COOKIE_SECURE'] = True
 app.config['SESSION_COOKIE_HTTPONLY'] = True
@@ -67,17 +123,32 @@ csrf = CSRFProtect(app)
 # Initialize database
 db.init_app(app)
 
-# Create all database tables if they don't exist
-with app.app_context():
-    # Use inspector to check if tables exist first
-    inspector = inspect(db.engine)
-
-    if not inspector.get_table_names():
-        db.create_all()
-    else:
-        # Create any missing tables
+# Create any missing tables (create_all already checks each table first).
+# Set INIT_DB=0 on workers whose schema is managed separately.
+if os.environ.get('INIT_DB', '1') == '1':
+    with app.app_context():
         db.create_all()
 
+# Dev guard against lazy loads / N+1 queries: with SQL_QUERY_BUDGET=N set,
+# requests that run more than N SQL statements are logged as warnings.
+SQL_QUERY_BUDGET = int(os.environ.get('SQL_QUERY_BUDGET', 0))
+if SQL_QUERY_BUDGET:
+    def _count_query(*args):
+        if has_request_context():
+            g.sql_query_count = g.get('sql_query_count', 0) + 1
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _count_query)
+
+    @app.after_request
+    def _check_query_budget(response):
+        count = g.get('sql_query_count', 0)
+        if count > SQL_QUERY_BUDGET:
+            app.logger.warning(
+                f"{request.endpoint} ran {count} SQL queries (budget {SQL_QUERY_BUDGET})"
+            )
+        return response
+
 # Initialize APScheduler and restore active watches
 from website.scheduler import init_scheduler
 init_scheduler(DATABASE_URI)
@@ -100,9 +171,17 @@ if _sched:
             weeks=1,
             id='campground_weekly_sync',
             name='Weekly campground data sync',
+            executor='sync',
             replace_existing=True,
         )
         app.logger.info("Scheduled weekly campground sync job")
+
+        def _on_campground_sync(event):
+            # Synced photos/descriptions replace the cached RC enrichment
+            if event.job_id == 'campground_weekly_sync':
+                _rc_enrich_cache_evict()
+
+        _sched.add_listener(_on_campground_sync, EVENT_JOB_EXECUTED)
     except Exception as _e:
         app.logger.warning(f"Could not schedule campground sync: {_e}")
 
@@ -129,27 +208,46 @@ formatter = logging.Formatter(
 )
 file_handler.setFormatter(formatter)
 
-# Set up logger
+# Set up logger. Request threads only enqueue records; a background
+# listener owns the file handler so disk writes stay off the request path.
+log_queue = queue.Queue(-1)
+log_listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)
+
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
-logger.addHandler(file_handler)
+logger.addHandler(QueueHandler(log_queue))
 
 # Required environment variables — no fallback to dev paths
 SCRIPT_DIR = os.environ.get('CAMPING_SCRIPT_DIR')
-VENV_PYTHON = os.environ.get('VENV_PYTHON')
 
-if not SCRIPT_DIR or not VENV_PYTHON:
+if not SCRIPT_DIR:
     raise RuntimeError(
-        "CAMPING_SCRIPT_DIR and VENV_PYTHON environment variables must be set. "
+        "CAMPING_SCRIPT_DIR environment variable must be set. "
         "Check your .env file."
     )
 
+# The camping script uses top-level imports (clients, enums, utils), so its
+# directory has to be on sys.path before camping_wrapper can be imported.
+# Appended rather than prepended so those generic names can't shadow
+# site-packages or the website package for every other import.
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+from camping_wrapper import run_search
+
 # Global counter for script executions
+# 'sessions' holds the most recent unique IPs (LRU order) so it can't grow
+# without bound in long-running workers
+MAX_TRACKED_SESSIONS = 10000
 script_executions = {
     'count': 0,
     'last_executed': None,
-    'sessions': set()
+    'sessions': OrderedDict()
 }
+# Request threads update script_executions concurrently; the LRU
+# insert/move/evict steps aren't atomic on their own
+script_executions_lock = Lock()
 
 # Register all routes
 register_routes(app)
@@ -161,7 +259,7 @@ csrf.exempt(payment_bp)
 # Add custom filter to parse JSON strings
 @app.template_filter('from_json')
 def from_json(value):
-    return json.loads(value)
+    return orjson.loads(value)
 
 @app.route('/')
 def index():
@@ -186,7 +284,9 @@ def campground_profile(provider, external_id):
         from flask import abort
         abort(404)
 
-    campground = Campground.query.filter_by(provider=provider, external_id=external_id).first()
+    # The profile shows the photo gallery, so load the deferred photos column
+    profile_query = Campground.query.options(undefer(Campground.photos))
+    campground = profile_query.filter_by(provider=provider, external_id=external_id).first()
 
     # On-demand sync if not in DB, stale (>7 days), or missing enrichment data
     needs_sync = (
@@ -198,7 +298,9 @@ def campground_profile(provider, external_id):
     if needs_sync:
         from website.services.campground_sync import sync_one
         sync_one(provider, external_id)
-        campground = Campground.query.filter_by(provider=provider, external_id=external_id).first()
+        if provider == 'rc':
+            _rc_enrich_cache_evict(external_id)
+        campground = profile_query.filter_by(provider=provider, external_id=external_id).first()
 
     if not campground:
         from flask import abort
@@ -218,6 +320,63 @@ def campground_profile_by_slug(slug):
     return redirect(url_for('campground_profile', provider=campground.provider, external_id=campground.external_id))
 
 
+def _recent_history(limit, user_id=None, device_id=None):
+    """Most recent search history entries as template dicts.
+
+    Only the columns the template needs are selected. Inside a request it
+    uses the request's session; from a worker thread it pushes its own app
+    context (and session). The statement is a lambda_stmt, so it is built
+    and cached once per branch and only the parameters change between calls.
+    """
+    stmt = lambda_stmt(lambda: select(*SearchHistory.dict_columns()))
+    if user_id is not None:
+        stmt += lambda s: s.where(SearchHistory.user_id == user_id)
+    else:
+        stmt += lambda s: s.where(SearchHistory.device_id == device_id)
+    stmt += lambda s: s.order_by(SearchHistory.created_at.desc()).limit(limit)
+
+    if has_app_context():
+        return [SearchHistory.row_to_dict(row) for row in db.session.execute(stmt).all()]
+    with app.app_context():
+        return [SearchHistory.row_to_dict(row) for row in db.session.execute(stmt).all()]
+
+# Shared pool for overlapping the /history queries on server databases.
+# SQLite runs them one after the other: its queries are local file reads,
+# so a thread hop and a second connection cost more than they save.
+_history_pool = None
+if not DATABASE_URI.startswith('sqlite'):
+    _history_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='history-read')
+
+def get_device_id(create=False):
+    """The anonymous visitor's device_id cookie as a UUID, memoized on `g`.
+
+    The ID is a random uuid4 set once per browser, and it is the only thing
+    that decides whose anonymous /history is shown, so it must not be
+    derivable from request data shared between visitors. Returns None when
+    the browser has no valid cookie, unless ``create`` is true; then a new
+    ID is generated and set_device_id_cookie sends it with the response.
+    """
+    if 'device_id' not in g:
+        try:
+            g.device_id = uuid.UUID(request.cookies.get('device_id', ''))
+        except ValueError:
+            g.device_id = None
+    if g.device_id is None and create:
+        g.device_id = uuid.uuid4()
+        g.new_device_id = True
+    return g.device_id
+
+@app.after_request
+def set_device_id_cookie(response):
+    if g.get('new_device_id'):
+        response.set_cookie(
+            'device_id', str(g.device_id), max_age=60*60*24*365,  # 1 year
+            secure=app.config['SESSION_COOKIE_SECURE'],
+            httponly=app.config['SESSION_COOKIE_HTTPONLY'],
+            samesite=app.config['SESSION_COOKIE_SAMESITE'],
+        )
+    return response
+
 @app.route('/history')
 def history():
     user = auth_service.get_current_user()
@@ -225,27 +384,44 @@ def history():
     watches = []
 
     if user:
+        # On server databases, load history on the shared pool while watches
+        # load here; the two queries are independent, so the page waits for
+        # the slower one only
+        history_future = None
+        if _history_pool is not None:
+            history_future = _history_pool.submit(_recent_history, 30, user_id=user.id)
+
         # Get active watches/subscriptions for this user
         watches = Subscription.query.filter_by(user_id=user.id).order_by(
             Subscription.active.desc(), Subscription.created_at.desc()
         ).all()
 
-        # Get history for authenticated user
-        history_records = SearchHistory.query.filter_by(user_id=user.id).order_by(
-            SearchHistory.created_at.desc()
-        ).limit(30).all()
-        history_items = [record.to_dict() for record in history_records]
+        if history_future is not None:
+            history_items = history_future.result()
+        else:
+            history_items = _recent_history(30, user_id=user.id)
     else:
         # Get history for anonymous user from device_id cookie
-        device_id = request.cookies.get('device_id')
+        device_id = get_device_id()
         if device_id:
-            history_records = SearchHistory.query.filter_by(device_id=device_id).order_by(
-                SearchHistory.created_at.desc()
-            ).limit(10).all()
-            history_items = [record.to_dict() for record in history_records]
+            history_items = _recent_history(10, device_id=device_id)
 
     return render_template('history.html', history_items=history_items, watches=watches, user=user)
 
+# Patterns for the park keys and date ranges produced by camping_wrapper
+_PARK_ID_RE = re.compile(r'\(((?:rc:|rg:)?\d+)\)')
+_PARK_NAME_STRIP_RE = re.compile(r'\s*\((?:rc:|rg:)?\d+\)\s*$')
+_RANGE_RE = re.compile(
+    r'(\d{4}-\d{2}-\d{2})\s*\([A-Za-z]+\)\s*->\s*(\d{4}-\d{2}-\d{2})\s*\([A-Za-z]+\)'
+)
+
+@lru_cache(maxsize=4096)
+def _stay_days(start_str, end_str):
+    """Check-in days of a stay as ISO date strings (the checkout day is excluded)."""
+    start_ordinal = date.fromisoformat(start_str).toordinal()
+    end_ordinal = date.fromisoformat(end_str).toordinal()
+    return tuple(date.fromordinal(o).isoformat() for o in range(start_ordinal, end_ordinal))
+
 def build_calendar_data(json_results, search_start, search_end, nights):
     """Transform date-range results into per-day calendar availability data.
 
@@ -273,9 +449,9 @@ def build_calendar_data(json_results, search_start, search_end, nights):
 
     for park_key, categories in json_results.items():
         # Extract park_id from name like "Kirby Cove (232447)" or "Big Basin (rc:718)"
-        park_id_match = re.search(r'\(((?:rc:|rg:)?\d+)\)', park_key)
+        park_id_match = _PARK_ID_RE.search(park_key)
         park_id = park_id_match.group(1) if park_id_match else ""
-        park_name = re.sub(r'\s*\((?:rc:|rg:)?\d+\)\s*$', '', park_key).strip()
+        park_name = _PARK_NAME_STRIP_RE.sub('', park_key).strip()
 
         # Determine provider from the park_id prefix
         provider = 'ReserveCalifornia' if park_id.startswith('rc:') else 'RecreationGov'
@@ -287,21 +463,14 @@ def build_calendar_data(json_results, search_start, search_end, nights):
             ranges = categories.get(category, {})
             for date_range_str, count in ranges.items():
                 # Parse "2025-08-15 (Fri) -> 2025-08-17 (Sun)"
-                match = re.match(
-                    r'(\d{4}-\d{2}-\d{2})\s*\([A-Za-z]+\)\s*->\s*(\d{4}-\d{2}-\d{2})\s*\([A-Za-z]+\)',
-                    date_range_str
-                )
+                match = _RANGE_RE.match(date_range_str)
                 if not match:
                     continue
 
                 start_str, end_str = match.group(1), match.group(2)
-                start_dt = datetime.strptime(start_str, '%Y-%m-%d')
-                end_dt = datetime.strptime(end_str, '%Y-%m-%d')
 
                 # Each night of the stay is a check-in day except the last (checkout)
-                current = start_dt
-                while current < end_dt:
-                    day_key = current.strftime('%Y-%m-%d')
+                for day_key in _stay_days(start_str, end_str):
                     # Only overwrite if this category has higher priority
                     if day_key not in dates:
                         dates[day_key] = {
@@ -309,7 +478,6 @@ def build_calendar_data(json_results, search_start, search_end, nights):
                             'type': category,
                             'checkout': end_str,
                         }
-                    current += timedelta(days=1)
 
         calendar_data[park_name] = {
             'park_id': park_id,
@@ -319,25 +487,69 @@ def build_calendar_data(json_results, search_start, search_end, nights):
 
     return calendar_data
 
+# Per-worker LRU in front of the shared search cache, so a worker that sees
+# the same search again skips the Redis round-trip. Entries expire after
+# LOCAL_SEARCH_CACHE_TTL, which bounds how much longer than the shared
+# cache they can live.
+LOCAL_SEARCH_CACHE_SIZE = 512
+LOCAL_SEARCH_CACHE_TTL = 60  # seconds
+_local_search_cache = OrderedDict()
+_local_search_cache_lock = Lock()
+
+def _local_search_cache_get(key):
+    with _local_search_cache_lock:
+        entry = _local_search_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, body = entry
+        if expires_at < time.monotonic():
+            del _local_search_cache[key]
+            return None
+        _local_search_cache.move_to_end(key)
+        return body
+
+def _local_search_cache_set(key, body):
+    with _local_search_cache_lock:
+        _local_search_cache[key] = (time.monotonic() + LOCAL_SEARCH_CACHE_TTL, body)
+        _local_search_cache.move_to_end(key)
+        if len(_local_search_cache) > LOCAL_SEARCH_CACHE_SIZE:
+            _local_search_cache.popitem(last=False)
+
 @app.route('/search', methods=['POST'])
 @limiter.limit("30 per minute")
 def search():
     try:
         data = request.get_json()
         
-        # Create cache key from search parameters (v2 = multi-campground support)
-        cache_key = f"search_v2_{data.get('parkId')}_{data.get('startDate')}_{data.get('endDate')}_{data.get('nights')}_{data.get('searchPreference')}"
+        # Create cache key from search parameters (v3 = cached as encoded JSON)
+        cache_key = f"search_v3_{data.get('parkId')}_{data.get('startDate')}_{data.get('endDate')}_{data.get('nights')}_{data.get('searchPreference')}"
         
-        # Try to get cached results
-        cached_result = cache.get(cache_key)
-        if cached_result:
+        # Try to get cached results, from this worker first
+        local_key = (
+            data.get('parkId'), data.get('startDate'), data.get('endDate'),
+            data.get('nights'), data.get('searchPreference'),
+        )
+        cached_body = _local_search_cache_get(local_key)
+        if cached_body is None:
+            cached_body = cache.get(cache_key)
+            if cached_body:
+                _local_search_cache_set(local_key, cached_body)
+        if cached_body:
             logger.info(f"Returning cached results for {cache_key}")
-            return jsonify(cached_result)
+            return app.response_class(cached_body, mimetype=app.json.mimetype)
         
         # Update execution stats
-        script_executions['count'] += 1
-        script_executions['last_executed'] = datetime.now()
-        script_executions['sessions'].add(request.remote_addr)
+        with script_executions_lock:
+            script_executions['count'] += 1
+            script_executions['last_executed'] = datetime.now()
+            sessions = script_executions['sessions']
+            sessions[request.remote_addr] = None
+            sessions.move_to_end(request.remote_addr)
+            if len(sessions) > MAX_TRACKED_SESSIONS:
+                sessions.popitem(last=False)
+            search_count = script_executions['count']
+            last_executed = script_executions['last_executed']
+            unique_users = len(sessions)
         
         # Log search parameters and stats
         logger.info("\n=== Search Parameters ===")
@@ -348,9 +560,9 @@ def search():
         logger.info(f"Search Preference: {data.get('searchPreference')}")
         logger.info("----------------------------------------")
         logger.info("Session Stats:")
-        logger.info(f"Total Searches: {script_executions['count']}")
-        logger.info(f"Last Search: {script_executions['last_executed'].strftime('%Y-%m-%d %H:%M:%S')}")
-        logger.info(f"Unique Users: {len(script_executions['sessions'])}")
+        logger.info(f"Total Searches: {search_count}")
+        logger.info(f"Last Search: {last_executed.strftime('%Y-%m-%d %H:%M:%S')}")
+        logger.info(f"Unique Users: {unique_users} (last {MAX_TRACKED_SESSIONS} tracked)")
         logger.info(f"Current User IP: {request.remote_addr}")
         logger.info("----------------------------------------")
         
@@ -364,13 +576,23 @@ def search():
         # Split IDs by provider
         from website.services.reserve_california import split_ids_by_provider, search_rc_availability
 
-        all_ids = [p.strip() for p in park_id.split(',') if p.strip()]
-        by_provider = split_ids_by_provider(park_id)
+        all_ids = [p for p in map(str.strip, park_id.split(',')) if p]
+        by_provider = split_ids_by_provider(all_ids)
         rg_ids = by_provider.get('rg', [])
         rc_ids = by_provider.get('rc', [])
 
         total_count = len(rg_ids) + len(rc_ids)
 
+        # Recreation.gov IDs end up in URL paths, so only plain digits pass;
+        # run_search makes the same checks, this just answers with a 400
+        bad_ids = [p for p in rg_ids if not (p.isascii() and p.isdigit())]
+        if bad_ids or not str(nights).isdigit() or int(nights) < 1:
+            logger.warning(f"Rejected search: park IDs {bad_ids}, nights {nights!r}")
+            return jsonify({
+                'success': False,
+                'error': 'Invalid campground ID or number of nights.',
+            }), 400
+
         # Restrict "all dates" search for large batches
         BATCH_SIZE = 5  # Process 5 campgrounds at a time
         if total_count > 8 and search_preference == 'all':
@@ -383,103 +605,68 @@ def search():
         logger.info(f"Searching {total_count} campground(s): RG={rg_ids}, RC={rc_ids}")
 
         # Save to search history
-        for pid in all_ids:
-            save_search_history(
-                park_id=pid,
-                start_date=start_date,
-                end_date=end_date,
-                nights=nights,
-                search_preference=search_preference,
-                campground_name=data.get('campgroundName', '')
-            )
-
-        # Use camping_wrapper.py directly with --json-output
-        WRAPPER_NAME = 'camping_wrapper.py'
+        save_search_history(
+            park_ids=all_ids,
+            start_date=start_date,
+            end_date=end_date,
+            nights=nights,
+            search_preference=search_preference,
+            campground_name=data.get('campgroundName', '')
+        )
 
         # Helper function to run search for a batch of Recreation.gov campgrounds
         def search_batch(batch_park_ids):
-            cmd = [
-                VENV_PYTHON,
-                os.path.join(SCRIPT_DIR, WRAPPER_NAME),
-                '--start-date', start_date,
-                '--end-date', end_date,
-                '--parks',
-            ]
-            cmd.extend(batch_park_ids)
-            cmd.extend([
-                '--nights', str(nights),
-                '--json-output',
-            ])
-
-            logger.info(f"Executing batch command: {' '.join(cmd)}")
-
-            timeout_seconds = max(60, len(batch_park_ids) * 30)
-
+            logger.info(f"Searching batch: {', '.join(batch_park_ids)}")
             try:
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    cwd=SCRIPT_DIR,
-                    timeout=timeout_seconds,
+                return run_search(
+                    start_date=start_date,
+                    end_date=end_date,
+                    parks=batch_park_ids,
+                    nights=int(nights),
                 )
-
-                logger.info(f"Batch completed. Return code: {result.returncode}")
-                logger.info(f"Output length: {len(result.stdout)} chars")
-                if result.stderr:
-                    logger.warning(f"Batch stderr: {result.stderr[:500]}")
-
-                if result.returncode != 0:
-                    logger.error(f"Batch command failed with return code {result.returncode}")
-                    return None
-
-                if not result.stdout or len(result.stdout) < 2:
-                    logger.error(f"Batch returned empty output: {result.stdout}")
-                    return None
-
-                return result.stdout
-            except subprocess.TimeoutExpired:
-                logger.error(f"Batch search timed out after {timeout_seconds} seconds")
-                return None
             except Exception as e:
                 logger.error(f"Batch search error: {str(e)}")
                 return None
 
-        # ── Recreation.gov search (existing subprocess path) ──
-        merged_json = {}
-        if rg_ids:
-            if len(rg_ids) <= BATCH_SIZE:
-                raw = search_batch(rg_ids)
-                if raw:
-                    try:
-                        merged_json = json.loads(raw)
-                    except json.JSONDecodeError as e:
-                        logger.error(f"JSON parse error: {e}")
-            else:
-                logger.info(f"Running batch search for {len(rg_ids)} RG campgrounds in batches of {BATCH_SIZE}")
-                for i in range(0, len(rg_ids), BATCH_SIZE):
-                    batch = rg_ids[i:i + BATCH_SIZE]
-                    logger.info(f"Processing batch {i//BATCH_SIZE + 1}: {len(batch)} campgrounds")
-                    raw = search_batch(batch)
-                    if raw:
-                        try:
-                            batch_json = json.loads(raw)
-                            merged_json.update(batch_json)
-                        except json.JSONDecodeError as e:
-                            logger.error(f"JSON parse error in batch {i//BATCH_SIZE + 1}: {e}")
-                    else:
-                        logger.warning(f"Batch {i//BATCH_SIZE + 1} timed out or failed")
-
-        # ── ReserveCalifornia search (in-process) ──
-        if rc_ids:
+        # Helper function to run the ReserveCalifornia search
+        def search_rc():
             logger.info(f"Searching {len(rc_ids)} ReserveCalifornia campground(s)")
             try:
                 rc_results = search_rc_availability(rc_ids, start_date, end_date, nights)
-                merged_json.update(rc_results)
                 logger.info(f"RC search returned {len(rc_results)} results")
+                return rc_results
             except Exception as e:
                 logger.error(f"ReserveCalifornia search error: {e}")
                 logger.error(traceback.format_exc())
+                return None
+
+        # ── Recreation.gov batches + ReserveCalifornia, run in parallel ──
+        # Every batch is network-bound, so wall time is the slowest batch
+        # rather than the sum. Results are merged in submission order to
+        # keep the response order stable.
+        rg_batches = [rg_ids[i:i + BATCH_SIZE] for i in range(0, len(rg_ids), BATCH_SIZE)]
+        if len(rg_batches) > 1:
+            logger.info(f"Running batch search for {len(rg_ids)} RG campgrounds in {len(rg_batches)} batches of {BATCH_SIZE}")
+
+        merged_json = {}
+        max_workers = min(4, len(rg_batches)) + (1 if rc_ids else 0)
+        if max_workers:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                # Submit RC first so it never queues behind RG batches
+                rc_future = pool.submit(search_rc) if rc_ids else None
+                rg_futures = [pool.submit(search_batch, batch) for batch in rg_batches]
+
+                for batch_num, future in enumerate(rg_futures, 1):
+                    batch_json = future.result()
+                    if batch_json is not None:
+                        merged_json.update(batch_json)
+                    else:
+                        logger.warning(f"Batch {batch_num} failed")
+
+                if rc_future is not None:
+                    rc_results = rc_future.result()
+                    if rc_results:
+                        merged_json.update(rc_results)
 
         if merged_json is None:
             logger.error("Search failed: all batches returned None")
@@ -512,10 +699,13 @@ def search():
                 'nights': int(nights),
             },
         }
-        cache.set(cache_key, response_data, timeout=180)
+        # Encode once; cache hits reuse the bytes instead of re-serializing
+        response = jsonify(response_data)
+        cache.set(cache_key, response.get_data(), timeout=180)
+        _local_search_cache_set(local_key, response.get_data())
 
         logger.info(f"Returning response with {len(calendar_data)} campgrounds")
-        return jsonify(response_data)
+        return response
 
     except Exception as e:
         logger.error(f"Search error: {str(e)}\n{traceback.format_exc()}")
@@ -539,15 +729,154 @@ def search():
             'error': str(e)
         }), 500
 
+def _pick_image(media):
+    """Pick the best RIDB image URL: prefer IsPrimary, then IsPreview, then first."""
+    best_rank, best_url = 3, ''
+    for m in media or ():
+        if m.get('MediaType') != 'Image' or not m.get('URL'):
+            continue
+        if m.get('IsPrimary'):
+            return m['URL']
+        rank = 1 if m.get('IsPreview') else 2
+        if rank < best_rank:
+            best_rank, best_url = rank, m['URL']
+    return best_url
+
+# Per-worker TTL cache of (image_url, description_overview) per RC external_id,
+# so repeat name searches skip the Campground query. Ids with no row are
+# cached as None. Entries are evicted when the campground is synced.
+RC_ENRICH_CACHE_SIZE = 10000
+RC_ENRICH_CACHE_TTL = 600  # seconds
+_rc_enrich_cache = OrderedDict()
+_rc_enrich_cache_lock = Lock()
+_MISSING = object()
+
+def _rc_enrich_cache_get(ext_id):
+    with _rc_enrich_cache_lock:
+        entry = _rc_enrich_cache.get(ext_id)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del _rc_enrich_cache[ext_id]
+            return _MISSING
+        _rc_enrich_cache.move_to_end(ext_id)
+        return value
+
+def _rc_enrich_cache_set_many(values):
+    expires_at = time.monotonic() + RC_ENRICH_CACHE_TTL
+    with _rc_enrich_cache_lock:
+        for ext_id, value in values.items():
+            _rc_enrich_cache[ext_id] = (expires_at, value)
+            _rc_enrich_cache.move_to_end(ext_id)
+        while len(_rc_enrich_cache) > RC_ENRICH_CACHE_SIZE:
+            _rc_enrich_cache.popitem(last=False)
+
+def _rc_enrich_cache_evict(ext_id=None):
+    """Drop one RC campground's cached enrichment, or all of them."""
+    with _rc_enrich_cache_lock:
+        if ext_id is None:
+            _rc_enrich_cache.clear()
+        else:
+            _rc_enrich_cache.pop(ext_id, None)
+
+def _enrich_rc_results(rc_results):
+    """Fill missing RC photos/descriptions from cached Campground rows.
+
+    Ids not in the local cache are fetched with one Core query, selecting
+    only the columns used here, so no Campground objects are built.
+    """
+    rc_ext_ids = [r['id'].replace('rc:', '') for r in rc_results]
+    if not rc_ext_ids:
+        return
+
+    rc_db_map = {}
+    missing_ids = []
+    for ext_id in rc_ext_ids:
+        value = _rc_enrich_cache_get(ext_id)
+        if value is _MISSING:
+            missing_ids.append(ext_id)
+        else:
+            rc_db_map[ext_id] = value
+
+    if missing_ids:
+        rc_rows = db.session.execute(
+            select(
+                Campground.external_id,
+                Campground.primary_photo_url,
+                Campground.description_overview,
+            ).where(Campground.provider == 'rc', Campground.external_id.in_(missing_ids))
+        ).all()
+        fetched = dict.fromkeys(missing_ids)
+        for row in rc_rows:
+            fetched[row.external_id] = (row.primary_photo_url, row.description_overview)
+        _rc_enrich_cache_set_many(fetched)
+        rc_db_map.update(fetched)
+
+    for site in rc_results:
+        ext_id = site['id'].replace('rc:', '')
+        cached = rc_db_map.get(ext_id)
+        if cached:
+            image_url, description_overview = cached
+            if not site.get('image_url') and image_url:
+                site['image_url'] = image_url
+            if (not site.get('description') or len(site.get('description', '')) < 50) and description_overview:
+                site['description'] = description_overview
+
+# RIDB facility fields copied into campsite results, fetched in one C call
+_RIDB_FIELD_NAMES = (
+    'FacilityID', 'FacilityName', 'FacilityDescription',
+    'FacilityLatitude', 'FacilityLongitude', 'FacilityTypeDescription',
+)
+_ridb_fields = itemgetter(*_RIDB_FIELD_NAMES)
+
+def _ridb_campsite(site):
+    """Shape an RIDB facility record for the campsite search responses."""
+    try:
+        fac_id, name, description, lat, lng, fac_type = _ridb_fields(site)
+    except KeyError:
+        # Fall back to per-field lookups if RIDB omits a field
+        fac_id, name, description, lat, lng, fac_type = map(site.get, _RIDB_FIELD_NAMES)
+    return {
+        'name': name,
+        'id': f"rg:{fac_id}",
+        'description': description,
+        'latitude': lat,
+        'longitude': lng,
+        'type': fac_type,
+        'provider': 'RecreationGov',
+        'image_url': _pick_image(site.get('MEDIA')),
+        'booking_url': f"https://www.recreation.gov/camping/campgrounds/{fac_id}",
+        'phone': site.get('FacilityPhone', ''),
+    }
+
+# Pooled session so RIDB pages reuse one TLS connection
+_ridb_session = requests.Session()
+RIDB_CACHE_TTL = 3600  # 1 hour
+
+# Include both Campgrounds and Cabins from Recreation.gov
+RIDB_ALLOWED_TYPES = frozenset({'Campground', 'Cabin'})
+
 def _fetch_ridb_facilities(lat, lng, radius=100, max_results=500):
     """Fetch facilities from RIDB with pagination.
 
     RIDB caps `limit` at 50 per request. This helper pages through
     results using `offset` until fewer than 50 are returned or
-    `max_results` is reached (safety cap: 10 iterations).
+    `max_results` is reached (safety cap: 10 iterations). Only facilities
+    of a type in RIDB_ALLOWED_TYPES are kept.
+
+    Complete results are cached for an hour per (lat, lng, radius), since
+    nearby users repeat the same geographic query.
     """
+    cache_key = f"ridb_camping_facilities_{lat}_{lng}_{radius}_{max_results}"
+    cached = cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"Returning cached RIDB facilities for {cache_key}")
+        return cached
+
     url = 'https://ridb.recreation.gov/api/v1/facilities'
     all_facilities = []
+    fetched = 0
     page_size = 50  # RIDB max per page
     max_pages = 10  # safety cap
 
@@ -564,20 +893,27 @@ def _fetch_ridb_facilities(lat, lng, radius=100, max_results=500):
         }
 
         logger.info(f"RIDB page {page + 1}: offset={offset}")
-        resp = requests.get(url, params=params, timeout=10)
+        resp = _ridb_session.get(url, params=params, timeout=10)
 
         if resp.status_code != 200:
             logger.error(f"RIDB API error on page {page + 1}: {resp.status_code}")
-            break
+            # Don't cache a partial result
+            return all_facilities
 
         batch = resp.json().get('RECDATA', [])
-        all_facilities.extend(batch)
-        logger.info(f"RIDB page {page + 1}: received {len(batch)} facilities (total {len(all_facilities)})")
+        page_count = len(batch)
+        batch = batch[:max_results - fetched]
+        fetched += len(batch)
+        all_facilities.extend(
+            f for f in batch if f.get('FacilityTypeDescription') in RIDB_ALLOWED_TYPES
+        )
+        logger.info(f"RIDB page {page + 1}: received {page_count} facilities (total {fetched}, {len(all_facilities)} kept)")
 
-        if len(batch) < page_size or len(all_facilities) >= max_results:
+        if page_count < page_size or fetched >= max_results:
             break
 
-    return all_facilities[:max_results]
+    cache.set(cache_key, all_facilities, timeout=RIDB_CACHE_TTL)
+    return all_facilities
 
 
 @app.route('/search_campsites', methods=['POST'])
@@ -622,61 +958,10 @@ def search_campsites():
 
         logger.info(f"Fetched {len(all_facilities)} RIDB facilities + {len(rc_results)} RC campgrounds")
 
-        # Include both Campgrounds and Cabins from Recreation.gov
-        ALLOWED_TYPES = {'Campground', 'Cabin'}
-        rg_campsites = []
-        for site in all_facilities:
-            if site.get('FacilityTypeDescription') not in ALLOWED_TYPES:
-                continue
-            # Pick the best image: prefer IsPrimary, then IsPreview, then first
-            image_url = ''
-            media = site.get('MEDIA') or []
-            for m in media:
-                if m.get('MediaType') == 'Image' and m.get('IsPrimary'):
-                    image_url = m.get('URL', '')
-                    break
-            if not image_url:
-                for m in media:
-                    if m.get('MediaType') == 'Image' and m.get('IsPreview'):
-                        image_url = m.get('URL', '')
-                        break
-            if not image_url:
-                for m in media:
-                    if m.get('MediaType') == 'Image' and m.get('URL'):
-                        image_url = m.get('URL', '')
-                        break
-            fac_id = site.get('FacilityID')
-            rg_campsites.append({
-                'name': site.get('FacilityName'),
-                'id': f"rg:{fac_id}",
-                'description': site.get('FacilityDescription'),
-                'latitude': site.get('FacilityLatitude'),
-                'longitude': site.get('FacilityLongitude'),
-                'type': site.get('FacilityTypeDescription'),
-                'provider': 'RecreationGov',
-                'image_url': image_url,
-                'booking_url': f"https://www.recreation.gov/camping/campgrounds/{fac_id}",
-                'phone': site.get('FacilityPhone', ''),
-            })
+        rg_campsites = [_ridb_campsite(site) for site in all_facilities]
 
         # Enrich RC results with photos/descriptions from DB
-        rc_ext_ids = [r['id'].replace('rc:', '') for r in rc_results]
-        rc_db_map = {}
-        if rc_ext_ids:
-            rc_records = Campground.query.filter(
-                Campground.provider == 'rc',
-                Campground.external_id.in_(rc_ext_ids)
-            ).all()
-            rc_db_map = {cg.external_id: cg for cg in rc_records}
-
-        for site in rc_results:
-            ext_id = site['id'].replace('rc:', '')
-            cg = rc_db_map.get(ext_id)
-            if cg:
-                if not site.get('image_url') and cg.photos:
-                    site['image_url'] = cg.primary_photo or ''
-                if (not site.get('description') or len(site.get('description', '')) < 50) and cg.description_overview:
-                    site['description'] = cg.description_overview
+        _enrich_rc_results(rc_results)
 
         # RC results already have the right shape (with rc: prefix and provider field)
         all_campsites = rg_campsites + rc_results
@@ -728,7 +1013,7 @@ def search_campsites_by_name():
         # RIDB name search
         if RECREATION_API_KEY:
             try:
-                resp = requests.get(
+                resp = _ridb_session.get(
                     'https://ridb.recreation.gov/api/v1/facilities',
                     params={
                         'query': query,
@@ -739,39 +1024,10 @@ def search_campsites_by_name():
                     timeout=10,
                 )
                 if resp.status_code == 200:
-                    for site in resp.json().get('RECDATA', []):
-                        ft = site.get('FacilityTypeDescription', '')
-                        if ft in ('Campground', 'Cabin'):
-                            # Pick the best image
-                            image_url = ''
-                            media = site.get('MEDIA') or []
-                            for m in media:
-                                if m.get('MediaType') == 'Image' and m.get('IsPrimary'):
-                                    image_url = m.get('URL', '')
-                                    break
-                            if not image_url:
-                                for m in media:
-                                    if m.get('MediaType') == 'Image' and m.get('IsPreview'):
-                                        image_url = m.get('URL', '')
-                                        break
-                            if not image_url:
-                                for m in media:
-                                    if m.get('MediaType') == 'Image' and m.get('URL'):
-                                        image_url = m.get('URL', '')
-                                        break
-                            fac_id = site.get('FacilityID')
-                            rg_results.append({
-                                'name': site.get('FacilityName'),
-                                'id': f"rg:{fac_id}",
-                                'description': site.get('FacilityDescription'),
-                                'latitude': site.get('FacilityLatitude'),
-                                'longitude': site.get('FacilityLongitude'),
-                                'type': ft,
-                                'provider': 'RecreationGov',
-                                'image_url': image_url,
-                                'booking_url': f"https://www.recreation.gov/camping/campgrounds/{fac_id}",
-                                'phone': site.get('FacilityPhone', ''),
-                            })
+                    rg_results = [
+                        _ridb_campsite(site) for site in resp.json().get('RECDATA', [])
+                        if site.get('FacilityTypeDescription') in RIDB_ALLOWED_TYPES
+                    ]
             except Exception as e:
                 logger.error(f"RIDB name search error: {e}")
 
@@ -782,21 +1038,7 @@ def search_campsites_by_name():
             logger.error(f"RC name search error: {e}")
 
         # Enrich RC results with photos/descriptions from DB
-        rc_ext_ids = [r['id'].replace('rc:', '') for r in rc_results]
-        if rc_ext_ids:
-            rc_records = Campground.query.filter(
-                Campground.provider == 'rc',
-                Campground.external_id.in_(rc_ext_ids)
-            ).all()
-            rc_db_map = {cg.external_id: cg for cg in rc_records}
-            for site in rc_results:
-                ext_id = site['id'].replace('rc:', '')
-                cg = rc_db_map.get(ext_id)
-                if cg:
-                    if not site.get('image_url') and cg.photos:
-                        site['image_url'] = cg.primary_photo or ''
-                    if (not site.get('description') or len(site.get('description', '')) < 50) and cg.description_overview:
-                        site['description'] = cg.description_overview
+        _enrich_rc_results(rc_results)
 
         return jsonify({
             'success': True,
@@ -833,26 +1075,89 @@ def inject_user():
         'current_user': user
     }
 
-def save_search_history(park_id, start_date, end_date, nights, search_preference, campground_name=""):
-    """Save the search to history for both logged in and anonymous users."""
+# Search history is written by a background thread so /search doesn't wait
+# on an INSERT + commit. Rows from many requests are collapsed into one
+# executemany INSERT per batch.
+HISTORY_BATCH_SIZE = 100
+HISTORY_BATCH_WAIT = 0.2  # seconds to wait for more rows before writing
+_history_queue = queue.Queue(maxsize=10000)
+_history_writer = None
+_history_writer_lock = Lock()
+
+def _write_history_rows(rows):
+    with app.app_context():
+        try:
+            db.session.execute(insert(SearchHistory), rows)
+            db.session.commit()
+        except Exception as e:
+            logger.error(f"Error writing {len(rows)} search history rows: {str(e)}")
+            db.session.rollback()
+
+def _drain_history_queue(first_row=None):
+    """Pop up to HISTORY_BATCH_SIZE queued rows and write them."""
+    rows = [] if first_row is None else [first_row]
+    deadline = time.monotonic() + HISTORY_BATCH_WAIT
+    while len(rows) < HISTORY_BATCH_SIZE:
+        timeout = deadline - time.monotonic()
+        try:
+            rows.append(_history_queue.get(timeout=timeout) if timeout > 0 else _history_queue.get_nowait())
+        except queue.Empty:
+            break
+    if rows:
+        _write_history_rows(rows)
+    return len(rows)
+
+def _run_history_writer():
+    while True:
+        _drain_history_queue(_history_queue.get())
+
+def _queue_history_rows(rows):
+    """Hand rows to the history writer, writing inline if the queue is full."""
+    global _history_writer
+    # Started lazily so each forked gunicorn worker gets its own thread
+    if _history_writer is None or not _history_writer.is_alive():
+        with _history_writer_lock:
+            if _history_writer is None or not _history_writer.is_alive():
+                _history_writer = Thread(target=_run_history_writer, name='history-writer', daemon=True)
+                _history_writer.start()
+
+    for i, row in enumerate(rows):
+        try:
+            _history_queue.put_nowait(row)
+        except queue.Full:
+            logger.warning("Search history queue full; writing synchronously")
+            _write_history_rows(rows[i:])
+            return
+
+@atexit.register
+def _flush_history_queue():
+    while not _history_queue.empty():
+        if not _drain_history_queue():
+            break
+
+# "..., City, ST" campground names; otherwise the last comma part is the city
+_CITY_STATE_RE = re.compile(r'^(?:.*,)?\s*([^,]+?)\s*,\s*([A-Za-z]{2,3})\s*$')
+_LAST_PART_RE = re.compile(r',\s*([^,]*?)\s*$')
+
+def save_search_history(park_ids, start_date, end_date, nights, search_preference, campground_name=""):
+    """Save the search to history for both logged in and anonymous users.
+
+    One row is queued per campground ID; the background history writer
+    inserts them (see `_queue_history_rows`).
+    """
     try:
         # Get user info
         user = auth_service.get_current_user()
         user_id = user.id if user else None
         
-        logger.debug(f"Current user: {user_id}, Cookie device_id: {request.cookies.get('device_id')}")
-        
-        # Get or create device_id for anonymous users
-        device_id = request.cookies.get('device_id')
-        if not user and not device_id:
-            device_id = str(uuid.uuid4())
-            logger.debug(f"Generated new device_id: {device_id}")
-            # Note: We'll set this cookie in the response
+        # Anonymous users are grouped by their device_id cookie, set on
+        # their first search
+        device_id = None if user else get_device_id(create=True)
         
         # Parse dates
         try:
-            start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
-            end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
+            start_date_obj = date.fromisoformat(start_date)
+            end_date_obj = date.fromisoformat(end_date)
         except ValueError:
             # Handle invalid date format
             logger.error(f"Invalid date format in search history: {start_date}, {end_date}")
@@ -861,56 +1166,45 @@ def save_search_history(park_id, start_date, end_date, nights, search_preference
         # Extract city/state from campground name if possible
         city = None
         state = None
-        if ',' in campground_name:
-            parts = campground_name.split(',')
-            if len(parts) >= 2:
-                # Last part might contain state
-                state_part = parts[-1].strip()
-                if len(state_part) <= 3:  # Likely a state abbreviation
-                    state = state_part
-                    city = parts[-2].strip()
-                else:
-                    city = state_part
-        
-        # Create history record
-        history_entry = SearchHistory(
-            user_id=user_id,
-            device_id=device_id if not user else None,  # Only set to None for logged-in users
-            park_id=park_id,
-            park_name=campground_name,
-            city=city,
-            state=state,
-            start_date=start_date_obj,
-            end_date=end_date_obj,
-            nights=int(nights),
-            search_preference=search_preference,
-            ip_address=request.remote_addr
-        )
+        m = _CITY_STATE_RE.match(campground_name)
+        if m:
+            city, state = m.groups()
+        else:
+            m = _LAST_PART_RE.search(campground_name)
+            if m:
+                city = m.group(1) or None
         
-        logger.debug(f"Saving search history: user_id={user_id}, device_id={device_id if not user else None}, park_id={park_id}")
+        # Create history rows; created_at is stamped now since the insert
+        # may happen a moment later on the writer thread
+        created_at = datetime.utcnow()
+        history_rows = [
+            {
+                'user_id': user_id,
+                'device_id': device_id,  # None for logged-in users
+                'park_id': park_id,
+                'park_name': campground_name,
+                'city': city,
+                'state': state,
+                'start_date': start_date_obj,
+                'end_date': end_date_obj,
+                'nights': int(nights),
+                'search_preference': search_preference,
+                'ip_address': request.remote_addr,
+                'created_at': created_at,
+            }
+            for park_id in park_ids
+        ]
         
-        db.session.add(history_entry)
-        db.session.commit()
+        logger.debug(f"Saving search history: user_id={user_id}, device_id={device_id}, park_ids={park_ids}")
         
-        # Store the device_id in the app context for the response
-        if not user and device_id:
-            logger.debug(f"Setting g.device_id: {device_id}")
-            g.device_id = device_id
+        _queue_history_rows(history_rows)
             
-        return history_entry
+        return history_rows
     except Exception as e:
         logger.error(f"Error saving search history: {str(e)}")
         db.session.rollback()
         return None
 
-# After request handler to set device_id cookie
-@app.after_request
-def set_device_id_cookie(response):
-    if hasattr(g, 'device_id'):
-        logger.debug(f"Setting device_id cookie: {g.device_id}")
-        response.set_cookie('device_id', g.device_id, max_age=60*60*24*365)  # 1 year
-    return response
-
 if __name__ == '__main__':
     # Set both Flask and logging to DEBUG level
     app.logger.setLevel(logging.DEBUG)
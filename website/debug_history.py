@@ -1,5 +1,6 @@
 import os
 import sys
+import uuid
 
 # Add the parent directory to sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -8,6 +9,9 @@ from website.app import app, db
 from website.models import SearchHistory, User
 from sqlalchemy import inspect
 
+# device_id is a UUID column; same fixed ID test_device_id.py uses
+TEST_DEVICE = uuid.uuid5(uuid.NAMESPACE_URL, 'test-device')
+
 if __name__ == "__main__":
     with app.app_context():
         # Check if the search_history table exists
@@ -37,8 +41,8 @@ if __name__ == "__main__":
                 print(f"  {record}")
             
             # Check if device_id query works
-            device_records = SearchHistory.query.filter_by(device_id='test-device').all()
-            print(f"\nRecords with device_id='test-device': {len(device_records)}")
+            device_records = SearchHistory.query.filter_by(device_id=TEST_DEVICE).all()
+            print(f"\nRecords with device_id={TEST_DEVICE}: {len(device_records)}")
             for record in device_records:
                 print(f"  {record}")
         else:
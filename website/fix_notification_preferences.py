@@ -0,0 +1,60 @@
+"""
+DB migration: un-double-encode ``users.notification_preferences``.
+
+Older rows were written as ``json.dumps(...)`` into the JSON column, so they
+hold a JSON *string* containing the preferences. This rewrites them as
+JSON objects.
+
+Run once:
+    PYTHONPATH=. python website/fix_notification_preferences.py
+"""
+
+import json
+import os
+import sys
+from sqlalchemy import bindparam, create_engine, inspect, select, update
+from dotenv import load_dotenv
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from website.models import User
+
+load_dotenv()
+
+DATABASE_URI = os.environ.get("DATABASE_URI", "sqlite:///camping.db")
+engine = create_engine(DATABASE_URI)
+
+
+def run():
+    if "users" not in inspect(engine).get_table_names():
+        print("  Table 'users' does not exist — skipping")
+        return
+
+    users = User.__table__
+    # engine.begin() commits all rewrites together
+    with engine.begin() as conn:
+        rows = conn.execute(select(users.c.id, users.c.notification_preferences)).all()
+        updates = []
+        for user_id, prefs in rows:
+            if not isinstance(prefs, str):
+                continue
+            try:
+                prefs = json.loads(prefs)
+            except ValueError:
+                prefs = None
+            updates.append({"uid": user_id, "prefs": prefs if isinstance(prefs, dict) else None})
+        if updates:
+            conn.execute(
+                update(users)
+                .where(users.c.id == bindparam("uid"))
+                .values(notification_preferences=bindparam("prefs")),
+                updates,
+            )
+        print(f"  Fixed notification_preferences for {len(updates)} user(s)")
+
+    print("Migration complete.")
+
+
+if __name__ == "__main__":
+    run()
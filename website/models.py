@@ -1,6 +1,8 @@
+from flask import g, has_request_context
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import deferred, validates
 from datetime import datetime
-import json
+from functools import cached_property
 import re
 import uuid
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -8,6 +10,25 @@ import urllib.parse
 
 db = SQLAlchemy()
 
+# Watch limits for the paid tiers; any other tier is free
+PAID_TIER_MAX_WATCHES = {
+    'basic': 10,
+    'supporter': 999,  # effectively unlimited
+}
+
+# Slugs keep [a-z0-9]; whitespace/hyphen runs become one hyphen and any
+# other character is dropped (so "O'Neill" -> "oneill")
+_SLUG_DROP_RE = re.compile(r'[^a-z0-9\s-]')
+_SLUG_SEP_RE = re.compile(r'[\s-]+')
+
+def _now():
+    """utcnow(), fixed for the rest of the request when inside one."""
+    if not has_request_context():
+        return datetime.utcnow()
+    if 'now' not in g:
+        g.now = datetime.utcnow()
+    return g.now
+
 class User(db.Model):
     __tablename__ = 'users'
     
@@ -22,11 +43,11 @@ class User(db.Model):
     phone_verified = db.Column(db.Boolean, default=False)
     whatsapp = db.Column(db.String(20), nullable=True)
     whatsapp_verified = db.Column(db.Boolean, default=False)
-    notification_preferences = db.Column(db.JSON, default=lambda: json.dumps({
+    notification_preferences = db.Column(db.JSON, default=lambda: {
         'email': True,
         'sms': False,
         'whatsapp': False
-    }))
+    })
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_login = db.Column(db.DateTime, nullable=True)
     # Legacy fields (kept for migration compat, unused)
@@ -38,8 +59,9 @@ class User(db.Model):
     subscription_tier = db.Column(db.String(20), default='free')  # 'free', 'basic', 'supporter'
     subscription_expires = db.Column(db.DateTime, nullable=True)
 
-    subscriptions = db.relationship('Subscription', backref='user', lazy=True, cascade="all, delete-orphan")
-    payments = db.relationship('Payment', backref='user', lazy=True, cascade="all, delete-orphan")
+    subscriptions = db.relationship('Subscription', back_populates='user', lazy=True, cascade="all, delete-orphan")
+    payments = db.relationship('Payment', back_populates='user', lazy=True, cascade="all, delete-orphan")
+    search_history = db.relationship('SearchHistory', back_populates='user', lazy=True)
 
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -47,24 +69,36 @@ class User(db.Model):
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
 
-    def _tier_active(self):
-        """True if the paid subscription hasn't expired."""
-        if self.subscription_tier == 'free':
+    @cached_property
+    def tier_active(self):
+        """True if the paid subscription hasn't expired.
+
+        Cached on the instance (which lives for one request/session); the
+        validator below drops it when the tier or expiry is reassigned.
+        """
+        if self.subscription_tier not in PAID_TIER_MAX_WATCHES:
             return False
-        if self.subscription_expires and self.subscription_expires < datetime.utcnow():
+        if self.subscription_expires and self.subscription_expires < _now():
             return False
         return True
 
+    @validates('subscription_tier', 'subscription_expires')
+    def _reset_tier_active(self, key, value):
+        self.__dict__.pop('tier_active', None)
+        return value
+
+    def _tier_active(self):
+        """Alias of `tier_active`, still called by the payment template."""
+        return self.tier_active
+
     def can_use_sms(self):
         """SMS/WhatsApp requires basic or supporter tier."""
-        return self.subscription_tier in ('basic', 'supporter') and self._tier_active()
+        return self.tier_active
 
     def max_watches(self):
         """Maximum active watches for this tier."""
-        if self.subscription_tier == 'supporter' and self._tier_active():
-            return 999  # effectively unlimited
-        if self.subscription_tier == 'basic' and self._tier_active():
-            return 10
+        if self.tier_active:
+            return PAID_TIER_MAX_WATCHES[self.subscription_tier]
         return 3  # free tier
 
     def can_receive_notifications(self):
@@ -84,7 +118,7 @@ class Subscription(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
-    subscription_id = db.Column(db.String(40), unique=True, default=lambda: str(uuid.uuid4()), index=True)
+    subscription_id = db.Column(db.String(40), unique=True, default=lambda: uuid.uuid4().hex, index=True)  # older rows hold 36-char hyphenated ids
     park_id = db.Column(db.String(20), nullable=False)
     campground_name = db.Column(db.String(200), nullable=True)
     provider = db.Column(db.String(30), default='RecreationGov')  # 'RecreationGov' or 'ReserveCalifornia'
@@ -100,7 +134,8 @@ class Subscription(db.Model):
     check_frequency = db.Column(db.Integer, default=60)  # minutes
     process_pid = db.Column(db.Integer, nullable=True)  # Store PID of background process
     
-    notifications = db.relationship('Notification', backref='subscription', lazy=True, cascade="all, delete-orphan")
+    user = db.relationship('User', back_populates='subscriptions')
+    notifications = db.relationship('Notification', back_populates='subscription', lazy=True, cascade="all, delete-orphan")
     
     def __repr__(self):
         return f'<Subscription {self.subscription_id} for Park {self.park_id}>'
@@ -117,6 +152,8 @@ class Notification(db.Model):
     sent_whatsapp = db.Column(db.Boolean, default=False)
     delivery_status = db.Column(db.JSON, nullable=True)  # Store delivery details
     
+    subscription = db.relationship('Subscription', back_populates='notifications')
+    
     def __repr__(self):
         return f'<Notification {self.id} for Subscription {self.subscription_id}>'
 
@@ -133,11 +170,16 @@ class Payment(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     payment_metadata = db.Column(db.JSON, nullable=True)  # Additional payment data
     
+    user = db.relationship('User', back_populates='payments')
+    
     def __repr__(self):
         return f'<Payment {self.id} of {self.amount} {self.currency} via {self.provider}>'
 
 class VerificationCode(db.Model):
     __tablename__ = 'verification_codes'
+    __table_args__ = (
+        db.Index('idx_verification_lookup', 'user_id', 'verification_type', 'used', 'expires_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -150,18 +192,37 @@ class VerificationCode(db.Model):
     def __repr__(self):
         return f'<VerificationCode for User {self.user_id}, Type: {self.verification_type}>'
 
+# Columns read by the /history list, carried in the user/device indexes so
+# Postgres can answer it with an index-only scan
+HISTORY_INDEX_INCLUDE = [
+    'id', 'park_id', 'park_name', 'city', 'state',
+    'start_date', 'end_date', 'nights', 'search_preference',
+]
+
+_MONTH_ABBRS = ('', 'Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+                'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+def _fmt_search_date(dt):
+    """Format like strftime('%b %d, %Y at %I:%M %p') without the locale lookups."""
+    return (f"{_MONTH_ABBRS[dt.month]} {dt.day:02d}, {dt.year} at "
+            f"{(dt.hour - 1) % 12 + 1:02d}:{dt.minute:02d} {'AM' if dt.hour < 12 else 'PM'}")
+
 class SearchHistory(db.Model):
     __tablename__ = 'search_history'
     __table_args__ = (
-        db.Index('idx_user_created', 'user_id', 'created_at'),
-        db.Index('idx_device_created', 'device_id', 'created_at'),
+        db.Index('idx_user_created', 'user_id', 'created_at',
+                 postgresql_include=HISTORY_INDEX_INCLUDE,
+                 postgresql_with={'fillfactor': 90}),
+        db.Index('idx_device_created', 'device_id', 'created_at',
+                 postgresql_include=HISTORY_INDEX_INCLUDE,
+                 postgresql_with={'fillfactor': 90}),
         db.Index('idx_park_id', 'park_id'),
         db.Index('idx_created_at', 'created_at'),
     )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True, index=True)  # Nullable for anonymous users
-    device_id = db.Column(db.String(64), nullable=True, index=True)  # Cookie-based ID for anonymous users
+    device_id = db.Column(db.Uuid, nullable=True, index=True)  # Anonymous visitor ID from get_device_id() (native uuid on Postgres)
     
     # Search parameters
     park_id = db.Column(db.String(20), nullable=False, index=True)
@@ -179,31 +240,52 @@ class SearchHistory(db.Model):
     ip_address = db.Column(db.String(50), nullable=True)
     
     # Relationship
-    user = db.relationship('User', backref=db.backref('search_history', lazy=True))
+    user = db.relationship('User', back_populates='search_history')
     
     def __repr__(self):
         return f'<SearchHistory for {self.park_name} ({self.park_id})>'
         
-    def to_dict(self):
-        """Convert to dictionary for easier templating."""
-        # Create URL-safe versions of strings
-        park_name_safe = urllib.parse.quote(self.park_name) if self.park_name else ''
-        city_safe = urllib.parse.quote(self.city) if self.city else ''
+    @classmethod
+    def dict_columns(cls):
+        """Columns read by `row_to_dict`, for list views that skip full ORM rows."""
+        return (
+            cls.id, cls.park_id, cls.park_name, cls.city, cls.state,
+            cls.start_date, cls.end_date, cls.nights, cls.search_preference,
+            cls.created_at,
+        )
+
+    @staticmethod
+    def row_to_dict(row):
+        """Convert a SearchHistory instance or `dict_columns` row for templating."""
+        start_date = row.start_date.isoformat() if row.start_date else ''
+        end_date = row.end_date.isoformat() if row.end_date else ''
         
         return {
-            'id': self.id,
-            'park_id': self.park_id,
-            'park_name': self.park_name,
-            'city': self.city,
-            'state': self.state,
-            'start_date': self.start_date.strftime('%Y-%m-%d') if self.start_date else '',
-            'end_date': self.end_date.strftime('%Y-%m-%d') if self.end_date else '',
-            'nights': self.nights,
-            'search_preference': self.search_preference,
-            'search_date': self.created_at.strftime('%b %d, %Y at %I:%M %p'),
-            'search_url': f'/?parkId={self.park_id}&startDate={self.start_date.strftime("%Y-%m-%d") if self.start_date else ""}&endDate={self.end_date.strftime("%Y-%m-%d") if self.end_date else ""}&nights={self.nights}&searchPreference={self.search_preference}&campgroundName={park_name_safe}&city={city_safe}#results'
+            'id': row.id,
+            'park_id': row.park_id,
+            'park_name': row.park_name,
+            'city': row.city,
+            'state': row.state,
+            'start_date': start_date,
+            'end_date': end_date,
+            'nights': row.nights,
+            'search_preference': row.search_preference,
+            'search_date': _fmt_search_date(row.created_at),
+            'search_url': '/?' + urllib.parse.urlencode({
+                'parkId': row.park_id,
+                'startDate': start_date,
+                'endDate': end_date,
+                'nights': row.nights,
+                'searchPreference': row.search_preference,
+                'campgroundName': row.park_name or '',
+                'city': row.city or '',
+            }) + '#results'
         }
 
+    def to_dict(self):
+        """Convert to dictionary for easier templating."""
+        return self.row_to_dict(self)
+
 class Campground(db.Model):
     __tablename__ = 'campgrounds'
 
@@ -253,7 +335,10 @@ class Campground(db.Model):
     driveway_surface = db.Column(db.String(50))
 
     # Media
-    photos = db.Column(db.JSON)                # [{"url": "...", "title": "...", ...}]
+    # [{"url": "...", "title": "...", ...}]; deferred so listing queries don't
+    # pull (and detoast) the whole array -- use primary_photo_url there
+    photos = deferred(db.Column(db.JSON))
+    primary_photo_url = db.Column(db.String(500))  # Denormalized from photos on assignment
     map_image_url = db.Column(db.String(500))
 
     # Booking
@@ -273,21 +358,30 @@ class Campground(db.Model):
         """Generate a URL-friendly slug from the campground name."""
         if not self.name:
             return ''
-        slug = self.name.lower()
-        slug = re.sub(r'[^a-z0-9\s-]', '', slug)
-        slug = re.sub(r'[\s_]+', '-', slug)
-        slug = re.sub(r'-+', '-', slug).strip('-')
-        return slug
+        slug = _SLUG_DROP_RE.sub('', self.name.lower())
+        return _SLUG_SEP_RE.sub('-', slug).strip('-')
 
-    @property
-    def primary_photo(self):
-        """Return the primary photo URL or first available."""
-        if not self.photos:
+    @staticmethod
+    def pick_primary_photo(photos):
+        """Return the primary photo URL from a ``photos`` list, or the first."""
+        if not photos:
             return ''
-        for p in self.photos:
+        for p in photos:
             if p.get('isPrimary'):
                 return p.get('url', '')
-        return self.photos[0].get('url', '') if self.photos else ''
+        return photos[0].get('url', '')
+
+    @validates('photos')
+    def _set_primary_photo_url(self, key, photos):
+        # Keep the denormalized column in sync so reads don't scan the JSON
+        self.primary_photo_url = self.pick_primary_photo(photos) or None
+        return photos
+
+    @property
+    def primary_photo(self):
+        """Return the primary photo URL or first available."""
+        # Rows synced before primary_photo_url existed fall back to the scan
+        return self.primary_photo_url or self.pick_primary_photo(self.photos)
 
     @property
     def profile_url(self):
@@ -10,8 +10,8 @@ payment_bp = Blueprint('payment', __name__, url_prefix='/payment')
 def index():
     """Payment / tier selection page."""
     user = auth_service.get_current_user()
-    payments = payment_service.get_user_payments(user.id)
-    return render_template('payment/index.html', user=user, payments=payments)
+    # The tier page doesn't list past payments, so don't query them
+    return render_template('payment/index.html', user=user)
 
 
 @payment_bp.route('/stripe/create-checkout', methods=['POST'])
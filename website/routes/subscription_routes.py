@@ -1,5 +1,6 @@
-from flask import Blueprint, request, redirect, render_template, url_for, flash, jsonify
+from flask import Blueprint, abort, request, redirect, render_template, url_for, flash, jsonify
 from datetime import datetime
+from sqlalchemy.orm import raiseload, selectinload
 from ..services import auth_service, subscription_service
 from ..models import db, Subscription
 
@@ -60,7 +61,12 @@ def create():
 def view(subscription_id):
     """View a specific subscription."""
     user = auth_service.get_current_user()
-    subscription = Subscription.query.filter_by(
+    # The page lists every notification, so load them alongside the watch;
+    # any other relationship access raises rather than lazy-loading
+    subscription = Subscription.query.options(
+        selectinload(Subscription.notifications).raiseload('*'),
+        raiseload('*'),
+    ).filter_by(
         subscription_id=subscription_id,
         user_id=user.id
     ).first_or_404()
@@ -72,10 +78,6 @@ def view(subscription_id):
 def update(subscription_id):
     """Update a subscription."""
     user = auth_service.get_current_user()
-    subscription = Subscription.query.filter_by(
-        subscription_id=subscription_id,
-        user_id=user.id
-    ).first_or_404()
     
     try:
         # Extract form data
@@ -87,21 +89,24 @@ def update(subscription_id):
         if 'checkFrequency' in request.form:
             updates['check_frequency'] = int(request.form.get('checkFrequency'))
         
-        # Update subscription
+        # Update subscription; the user_id filter makes other users' watches 404
         subscription = subscription_service.update_subscription(
-            subscription_id, **updates
+            subscription_id, user_id=user.id, **updates
         )
-        
-        return jsonify({
-            'success': True,
-            'message': 'Subscription updated successfully'
-        })
     
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
         })
+    
+    if subscription is None:
+        abort(404)
+    
+    return jsonify({
+        'success': True,
+        'message': 'Subscription updated successfully'
+    })
 
 @subscription_bp.route('/<subscription_id>/delete', methods=['POST'])
 @auth_service.require_login
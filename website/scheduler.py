@@ -6,6 +6,7 @@ from app.py after the database has been created.
 """
 
 import logging
+import os
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from apscheduler.executors.pool import ThreadPoolExecutor
@@ -27,8 +28,12 @@ def init_scheduler(database_uri):
     jobstores = {
         'default': SQLAlchemyJobStore(url=database_uri),
     }
+    # Watch checks spend their time waiting on HTTP calls, so
+    # they get a wide thread pool; the long weekly sync runs on its own
+    # single thread so it never holds check slots.
     executors = {
-        'default': ThreadPoolExecutor(max_workers=5),
+        'default': ThreadPoolExecutor(max_workers=int(os.environ.get('SCHEDULER_WORKERS', 10))),
+        'sync': ThreadPoolExecutor(max_workers=1),
     }
     job_defaults = {
         'coalesce': True,       # combine missed runs into one
@@ -1,10 +1,10 @@
 from website.services.auth_service import AuthService
-from website.services.notification_service import NotificationService
+from website.services.notification_service import get_notification_service
 from website.services.payment_service import PaymentService
 from website.services.subscription_service import SubscriptionService
 
 # Initialize service instances
 auth_service = AuthService()
-notification_service = NotificationService()
+notification_service = get_notification_service()
 payment_service = PaymentService()
 subscription_service = SubscriptionService() 
\ No newline at end of file
@@ -1,11 +1,17 @@
 import os
 import logging
-import json
 import random
+import re
 import string
+import time
 from datetime import datetime, timedelta
+from functools import wraps
+from threading import Lock
+import orjson
 import requests
-from flask import session, redirect, url_for, request
+from requests.adapters import HTTPAdapter
+from flask import session, redirect, url_for, request, g
+from sqlalchemy import or_, update
 from oauthlib.oauth2 import WebApplicationClient
 
 # Only allow insecure OAuth transport in debug mode
@@ -13,11 +19,22 @@ if os.environ.get('FLASK_DEBUG', '0') == '1':
     os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'
 
 from ..models import db, User, VerificationCode
-from .notification_service import NotificationService
+from .notification_service import get_notification_service
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# OIDC discovery documents by URL, as (config, expires_at monotonic time).
+# Google serves them with Cache-Control max-age, which sets the TTL.
+DISCOVERY_CACHE_TTL = 3600  # seconds, when the response has no max-age
+_discovery_cache = {}
+_discovery_cache_lock = Lock()
+_MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+# Pooled session so OAuth calls to Google reuse kept-alive TLS connections
+_google_session = requests.Session()
+_google_session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=50))
+
 class AuthService:
     def __init__(self):
         # Google OAuth configuration
@@ -26,7 +43,7 @@ class AuthService:
         self.google_discovery_url = "https://accounts.google.com/.well-known/openid-configuration"
         
         # Initialize notification service
-        self.notification_service = NotificationService()
+        self.notification_service = get_notification_service()
         
         # Initialize OAuth client if credentials are available
         self.google_client = None
@@ -34,12 +51,26 @@ class AuthService:
             self.google_client = WebApplicationClient(self.google_client_id)
     
     def get_google_provider_cfg(self):
-        """Get Google's OAuth 2.0 endpoints."""
+        """Get Google's OAuth 2.0 endpoints, cached for the response's max-age."""
+        url = self.google_discovery_url
+        with _discovery_cache_lock:
+            cached = _discovery_cache.get(url)
+        if cached and time.monotonic() < cached[1]:
+            return cached[0]
+
         try:
-            return requests.get(self.google_discovery_url).json()
+            response = _google_session.get(url, timeout=5)
+            response.raise_for_status()
+            cfg = orjson.loads(response.content)
         except Exception as e:
             logger.error(f"Error getting Google provider config: {str(e)}")
             return None
+
+        m = _MAX_AGE_RE.search(response.headers.get('Cache-Control', ''))
+        ttl = int(m.group(1)) if m else DISCOVERY_CACHE_TTL
+        with _discovery_cache_lock:
+            _discovery_cache[url] = (cfg, time.monotonic() + ttl)
+        return cfg
     
     def get_google_auth_url(self, redirect_uri=None):
         """Get the Google authentication URL."""
@@ -103,26 +134,30 @@ class AuthService:
                 code=code
             )
             logger.debug(f"Sending token request to: {token_url}")
-            token_response = requests.post(
+            token_body = _google_session.post(
                 token_url,
                 headers=headers,
                 data=body,
                 auth=(self.google_client_id, self.google_client_secret),
-            ).json()
+                timeout=10,
+            ).content
+            token_response = orjson.loads(token_body)
             
             logger.debug(f"Token response received: {token_response.get('token_type', 'No token_type')}")
             if 'error' in token_response:
                 logger.error(f"Token response error: {token_response.get('error')}, {token_response.get('error_description', '')}")
                 return None
                 
-            # Parse token response
-            self.google_client.parse_request_body_response(json.dumps(token_response))
+            # Parse token response from the raw body rather than re-serialising it
+            self.google_client.parse_request_body_response(token_body.decode())
             
             # Get user info endpoint
             userinfo_endpoint = google_provider_cfg["userinfo_endpoint"]
             uri, headers, body = self.google_client.add_token(userinfo_endpoint)
             logger.debug(f"Getting user info from: {uri}")
-            userinfo_response = requests.get(uri, headers=headers, data=body).json()
+            userinfo_response = orjson.loads(
+                _google_session.get(uri, headers=headers, data=body, timeout=5).content
+            )
             
             if 'error' in userinfo_response:
                 logger.error(f"User info error: {userinfo_response.get('error')}")
@@ -144,11 +179,13 @@ class AuthService:
             logger.debug(f"Profile picture: {profile_picture}")
             logger.debug(f"Language: {language_preference}")
             
-            # Check if user exists
-            user = User.query.filter_by(google_id=google_id).first()
+            # Check if user exists, by Google ID or else by email, in one query
+            matches = User.query.filter(
+                or_(User.google_id == google_id, User.email == email)
+            ).limit(2).all()
+            user = next((u for u in matches if u.google_id == google_id), None)
             if not user:
-                # Check by email
-                user = User.query.filter_by(email=email).first()
+                user = next((u for u in matches if u.email == email), None)
                 if user:
                     # Update existing user with Google ID
                     user.google_id = google_id
@@ -256,23 +293,32 @@ class AuthService:
         return True
     
     def get_current_user(self):
-        """Get the current logged-in user."""
+        """Get the current logged-in user.
+
+        The result is memoized on ``g`` for the rest of the request, keyed on
+        the session's user_id so a login or logout mid-request is picked up.
+        """
         user_id = session.get('user_id')
         if not user_id:
             return None
         
-        return User.query.get(user_id)
+        cached = g.get('current_user')
+        if cached is not None and cached[0] == user_id:
+            return cached[1]
+        
+        user = User.query.get(user_id)
+        g.current_user = (user_id, user)
+        return user
     
     def require_login(self, func):
         """Decorator to require login for a view."""
+        @wraps(func)
         def wrapper(*args, **kwargs):
             user = self.get_current_user()
             if not user:
                 return redirect(url_for('auth.login', next=request.path))
             return func(*args, **kwargs)
         
-        # Preserve function metadata for Flask routing
-        wrapper.__name__ = func.__name__
         return wrapper
     
     def generate_verification_code(self, user_id, verification_type):
@@ -302,26 +348,35 @@ class AuthService:
     
     def verify_code(self, user_id, code, verification_type):
         """Verify a code for SMS or WhatsApp."""
-        # Get the most recent unused code that hasn't expired
-        verification = VerificationCode.query.filter_by(
-            user_id=user_id,
-            code=code,
-            verification_type=verification_type,
-            used=False
+        # Get the most recent unused code that hasn't expired, with its user
+        row = db.session.query(VerificationCode, User).join(
+            User, User.id == VerificationCode.user_id
         ).filter(
+            VerificationCode.user_id == user_id,
+            VerificationCode.code == code,
+            VerificationCode.verification_type == verification_type,
+            VerificationCode.used == False,
             VerificationCode.expires_at > datetime.utcnow()
         ).order_by(
             VerificationCode.created_at.desc()
         ).first()
         
-        if not verification:
+        if not row:
             return False
+        verification, user = row
         
-        # Mark code as used
-        verification.used = True
+        # Claim the code with a conditional UPDATE so two concurrent verifies
+        # can't both succeed on it
+        result = db.session.execute(
+            update(VerificationCode)
+            .where(VerificationCode.id == verification.id, VerificationCode.used == False)
+            .values(used=True)
+        )
+        if result.rowcount != 1:
+            db.session.rollback()
+            return False
         
         # Update user verification status
-        user = User.query.get(user_id)
         if verification_type == 'sms':
             user.phone_verified = True
         elif verification_type == 'whatsapp':
@@ -337,7 +392,7 @@ class AuthService:
         if not user:
             return False
         
-        user.notification_preferences = json.dumps(preferences)
+        user.notification_preferences = preferences
         db.session.commit()
         
         return True 
\ No newline at end of file
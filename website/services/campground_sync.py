@@ -514,6 +514,7 @@ def sync_all():
     Discovers RG campgrounds via a lat/lng grid covering western US,
     and all RC campgrounds from metadata.  Should be run within app context.
     """
+    from sqlalchemy import select
     from website.models import db, Campground
     from website.services.reserve_california import _fetch_rc_metadata
 
@@ -561,6 +562,13 @@ def sync_all():
         (44.06, -121.31),   # Bend
     ]
 
+    # last_synced for every RG campground in one column-only query, instead
+    # of loading a full Campground row per facility in the grid loop
+    rg_last_synced = dict(db.session.execute(
+        select(Campground.external_id, Campground.last_synced)
+        .where(Campground.provider == 'rg')
+    ).all())
+
     for lat, lng in grid_points:
         logger.info(f"RG grid search at ({lat}, {lng})...")
         try:
@@ -586,14 +594,15 @@ def sync_all():
                     continue
 
                 # Skip if recently synced
-                existing = Campground.query.filter_by(provider='rg', external_id=fid).first()
-                if existing and existing.last_synced:
-                    age_days = (datetime.utcnow() - existing.last_synced).days
+                last_synced = rg_last_synced.get(fid)
+                if last_synced:
+                    age_days = (datetime.utcnow() - last_synced).days
                     if age_days < 7:
                         continue
 
                 try:
-                    _sync_rg_campground(fid, db, Campground)
+                    if _sync_rg_campground(fid, db, Campground):
+                        rg_last_synced[fid] = datetime.utcnow()
                     synced_count += 1
                 except Exception as e:
                     logger.error(f"Error syncing RG {fid}: {e}")
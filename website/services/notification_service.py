@@ -7,6 +7,7 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
+from threading import Lock
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -226,4 +227,22 @@ Reply STOP to end notifications.
                 user.email, 
                 "Verify Your Camping Alert Email", 
                 html_content
-            ) 
\ No newline at end of file
+            ) 
+
+
+_shared_service = None
+_shared_service_lock = Lock()
+
+
+def get_notification_service():
+    """Return the process-wide NotificationService, creating it on first use.
+
+    The Twilio client it holds is safe to share across request and
+    scheduler threads.
+    """
+    global _shared_service
+    if _shared_service is None:
+        with _shared_service_lock:
+            if _shared_service is None:
+                _shared_service = NotificationService()
+    return _shared_service
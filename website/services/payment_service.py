@@ -154,8 +154,3 @@ class PaymentService:
         user = User.query.filter_by(stripe_customer_id=customer_id).first()
         if user:
             logger.warning(f"Payment failed for user {user.id}")
-
-    # ---- queries ----
-
-    def get_user_payments(self, user_id):
-        return Payment.query.filter_by(user_id=user_id).order_by(Payment.created_at.desc()).all()
@@ -93,13 +93,13 @@ def parse_provider_id(prefixed_id):
     return ("rg", prefixed_id)
 
 
-def split_ids_by_provider(comma_separated):
-    """Split ``'rg:232447,rc:718,rc:720'`` → ``{'rg': ['232447'], 'rc': ['718','720']}``."""
+def split_ids_by_provider(ids):
+    """Split ``['rg:232447', 'rc:718', 'rc:720']`` → ``{'rg': ['232447'], 'rc': ['718','720']}``.
+
+    ``ids`` must already be stripped and non-empty.
+    """
     result = {"rg": [], "rc": []}
-    for raw in str(comma_separated).split(","):
-        raw = raw.strip()
-        if not raw:
-            continue
+    for raw in ids:
         provider, fid = parse_provider_id(raw)
         result.setdefault(provider, []).append(fid)
     return result
@@ -275,6 +275,14 @@ def _format_date_range(start_str, end_str):
     return f"{start_str} ({s.strftime('%a')}) -> {end_str} ({e.strftime('%a')})"
 
 
+# Weekday sets used by ``_classify_range`` (Mon=0 .. Sun=6)
+_FRI_SAT = frozenset({4, 5})
+_THU_SUN = frozenset({3, 6})
+_THU_FRI = frozenset({3, 4})
+_THU_TO_SUN = frozenset({3, 4, 5, 6})
+_SAT_SUN_MON = frozenset({5, 6, 0})
+
+
 def _classify_range(start_date, end_date, min_nights):
     """Port of ``camping_wrapper.filter_by_days`` logic.
 
@@ -284,31 +292,37 @@ def _classify_range(start_date, end_date, min_nights):
     if num_nights < min_nights:
         return None
 
+    # 5+ nights — everything is priority, no need to look at weekdays
+    if min_nights >= 5:
+        return "priority"
+
+    start_dow = start_date.weekday()
+
     if min_nights == 1:
-        if start_date.weekday() in (4, 5):
+        if start_dow in _FRI_SAT:
             return "priority"
-        if start_date.weekday() in (3, 6):
+        if start_dow in _THU_SUN:
             return "regular"
         return "ignored"
 
     if min_nights == 2:
-        if start_date.weekday() == 4 and (start_date + timedelta(days=1)).weekday() == 5:
+        # Starting Friday means the second night is Saturday
+        if start_dow == 4:
             return "priority"
-        if start_date.weekday() in (3, 4, 5, 6) and end_date.weekday() in (5, 6, 0):
+        if start_dow in _THU_TO_SUN and end_date.weekday() in _SAT_SUN_MON:
             return "regular"
         return "ignored"
 
     if min_nights == 3:
-        if start_date.weekday() in (3, 4):
+        if start_dow in _THU_FRI:
             return "priority"
         return "ignored"
 
     if min_nights == 4:
-        if start_date.weekday() == 3:
+        if start_dow == 3:
             return "priority"
         return "ignored"
 
-    # 5+ nights — everything is priority
     return "priority"
 
 
@@ -327,6 +341,9 @@ def search_rc_availability(facility_ids, start_date_str, end_date_str, nights):
     start_dt = datetime.strptime(start_date_str, "%Y-%m-%d")
     end_dt = datetime.strptime(end_date_str, "%Y-%m-%d")
     nights = int(nights)
+    # Day offsets are the same for every facility and window
+    offsets = [timedelta(days=n) for n in range(1, nights)]
+    stay = timedelta(days=nights)
 
     merged = {}
 
@@ -370,8 +387,8 @@ def search_rc_availability(facility_ids, start_date_str, end_date_str, nights):
             # Check if `nights` consecutive days starting from `day` are all free
             window_ok = True
             min_count = free_by_date.get(day_str, 0)
-            for n in range(1, nights):
-                next_day = (day + timedelta(days=n)).strftime("%Y-%m-%d")
+            for offset in offsets:
+                next_day = (day + offset).strftime("%Y-%m-%d")
                 if next_day not in date_set:
                     window_ok = False
                     break
@@ -380,7 +397,7 @@ def search_rc_availability(facility_ids, start_date_str, end_date_str, nights):
             if not window_ok:
                 continue
 
-            checkout = day + timedelta(days=nights)
+            checkout = day + stay
             checkout_str = checkout.strftime("%Y-%m-%d")
             window_key = (day_str, checkout_str)
             if window_key in seen_windows:
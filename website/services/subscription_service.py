@@ -1,12 +1,12 @@
-import os
-import subprocess
 import logging
 import hashlib
 import json
 from datetime import datetime, timedelta
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import raiseload
 
 from ..models import db, Subscription, Notification, User
-from .notification_service import NotificationService
+from .notification_service import get_notification_service
 from ..scheduler import get_scheduler
 
 logger = logging.getLogger(__name__)
@@ -84,26 +84,17 @@ def check_subscription(subscription_id, app_import_name):
                 db.session.commit()
                 return
         else:
-            # Recreation.gov: existing subprocess path
-            script_dir = os.environ.get('CAMPING_SCRIPT_DIR', '')
-            python_path = os.environ.get('VENV_PYTHON', 'python')
-
-            cmd = [
-                python_path,
-                os.path.join(script_dir, 'camping_wrapper.py'),
-                '--start-date', subscription.start_date.strftime('%Y-%m-%d'),
-                '--end-date', subscription.end_date.strftime('%Y-%m-%d'),
-                '--parks', park_id,
-                '--nights', str(subscription.nights),
-                '--json-output',
-            ]
-
+            # Recreation.gov: same in-process search /search uses. The app put
+            # the camping script directory on sys.path at import time.
+            from camping_wrapper import run_search
             try:
-                result = subprocess.run(
-                    cmd, capture_output=True, text=True,
-                    cwd=script_dir, timeout=120,
+                rg_json = run_search(
+                    subscription.start_date.strftime('%Y-%m-%d'),
+                    subscription.end_date.strftime('%Y-%m-%d'),
+                    [park_id],
+                    subscription.nights,
                 )
-                output = result.stdout.strip()
+                output = json.dumps(rg_json)
             except Exception as e:
                 logger.error(f"Subscription {subscription_id} check failed: {e}")
                 subscription.last_checked = datetime.utcnow()
@@ -116,7 +107,17 @@ def check_subscription(subscription_id, app_import_name):
             db.session.commit()
             return
 
-        result_hash = hashlib.sha256(output.encode()).hexdigest()
+        try:
+            changes = json.loads(output) if output.startswith('{') else [output]
+        except json.JSONDecodeError:
+            changes = [output]
+
+        # Hash the results re-serialised with json.dumps defaults rather than
+        # the raw output, so the wrapper's compact --json-output separators
+        # don't change the hash of unchanged results (and it still matches
+        # hashes stored before the wrapper switched formats)
+        canonical = json.dumps(changes) if isinstance(changes, dict) else output
+        result_hash = hashlib.sha256(canonical.encode()).hexdigest()
         if result_hash == subscription.last_result_hash:
             db.session.commit()
             return
@@ -132,11 +133,6 @@ def check_subscription(subscription_id, app_import_name):
                 send = False
 
         if send:
-            try:
-                changes = json.loads(output) if output.startswith('{') else [output]
-            except json.JSONDecodeError:
-                changes = [output]
-
             _send_notification(subscription, changes)
             subscription.last_notification = datetime.utcnow()
 
@@ -144,8 +140,12 @@ def check_subscription(subscription_id, app_import_name):
 
 
 def _send_notification(subscription, changes):
-    """Send notifications for a subscription change."""
-    notification_service = NotificationService()
+    """Send notifications for a subscription change.
+
+    The Notification row is only added to the session; check_subscription
+    commits it together with the subscription's own updates.
+    """
+    notification_service = get_notification_service()
     user = User.query.get(subscription.user_id)
 
     if not user:
@@ -157,11 +157,15 @@ def _send_notification(subscription, changes):
         subscription_id=subscription.id,
         message=json.dumps(changes) if isinstance(changes, (dict, list)) else str(changes),
     )
-    db.session.add(notification)
 
-    try:
-        prefs = json.loads(user.notification_preferences)
-    except Exception:
+    prefs = user.notification_preferences
+    if isinstance(prefs, str):
+        # Double-encoded row not yet fixed by fix_notification_preferences.py
+        try:
+            prefs = json.loads(prefs)
+        except ValueError:
+            prefs = None
+    if not isinstance(prefs, dict):
         prefs = {'email': True, 'sms': False, 'whatsapp': False}
 
     results = {}
@@ -183,32 +187,42 @@ def _send_notification(subscription, changes):
             notification.sent_whatsapp = results['whatsapp'].get('success', False)
 
     notification.delivery_status = json.dumps(results)
-    db.session.commit()
+    db.session.add(notification)
 
 
 # ---- SubscriptionService class ----
 
 class SubscriptionService:
     def __init__(self):
-        self.notification_service = NotificationService()
+        self.notification_service = get_notification_service()
 
     # --- CRUD ---
 
     def create_subscription(self, user_id, park_id, campground_name, start_date,
                             end_date, nights, search_preference, check_frequency=60,
                             provider='RecreationGov'):
-        subscription = Subscription(
-            user_id=user_id,
-            park_id=park_id,
-            campground_name=campground_name,
-            provider=provider,
-            start_date=start_date,
-            end_date=end_date,
-            nights=nights,
-            search_preference=search_preference,
-            check_frequency=check_frequency,
-        )
-        db.session.add(subscription)
+        """Insert a watch and schedule its check job.
+
+        Uses INSERT ... RETURNING and returns that row (id, subscription_id,
+        check_frequency), so nothing is re-read after the commit.
+        """
+        subscription = db.session.execute(
+            insert(Subscription).values(
+                user_id=user_id,
+                park_id=park_id,
+                campground_name=campground_name,
+                provider=provider,
+                start_date=start_date,
+                end_date=end_date,
+                nights=nights,
+                search_preference=search_preference,
+                check_frequency=check_frequency,
+            ).returning(
+                Subscription.id,
+                Subscription.subscription_id,
+                Subscription.check_frequency,
+            )
+        ).one()
         db.session.commit()
 
         self._schedule_job(subscription)
@@ -232,15 +246,29 @@ class SubscriptionService:
         self._schedule_job(subscription)
         return True
 
-    def update_subscription(self, subscription_id, **kwargs):
-        subscription = Subscription.query.filter_by(subscription_id=subscription_id).first()
-        if not subscription:
-            return None
+    def update_subscription(self, subscription_id, user_id=None, **kwargs):
+        """Update a watch's columns in one UPDATE ... RETURNING.
+
+        Returns the updated (id, subscription_id, active, check_frequency)
+        row, or None if no watch matches (or it belongs to another user).
+        """
+        values = {key: value for key, value in kwargs.items() if key in Subscription.__table__.c}
+        returned = (
+            Subscription.id, Subscription.subscription_id,
+            Subscription.active, Subscription.check_frequency,
+        )
+        where = [Subscription.subscription_id == subscription_id]
+        if user_id is not None:
+            where.append(Subscription.user_id == user_id)
 
-        for key, value in kwargs.items():
-            if hasattr(subscription, key):
-                setattr(subscription, key, value)
+        if values:
+            stmt = update(Subscription).where(*where).values(**values).returning(*returned)
+        else:
+            stmt = select(*returned).where(*where)
+        subscription = db.session.execute(stmt).one_or_none()
         db.session.commit()
+        if subscription is None:
+            return None
 
         if subscription.active:
             self._remove_job(subscription)
@@ -265,7 +293,11 @@ class SubscriptionService:
         return errors
 
     def get_user_subscriptions(self, user_id):
-        return Subscription.query.filter_by(user_id=user_id).order_by(Subscription.created_at.desc()).all()
+        # The list only shows watch columns; raiseload makes any relationship
+        # access (an N+1 per row) fail loudly instead
+        return Subscription.query.options(raiseload('*')).filter_by(
+            user_id=user_id
+        ).order_by(Subscription.created_at.desc()).all()
 
     # --- scheduler helpers ---
 
@@ -308,12 +340,13 @@ class SubscriptionService:
             return
 
         active = Subscription.query.filter_by(active=True).all()
+        today = datetime.utcnow().date()
         restored = 0
+        expired_ids = []
         for sub in active:
-            # Auto-expire
-            if sub.end_date < datetime.utcnow().date():
-                sub.active = False
-                db.session.commit()
+            # Auto-expire (deactivated in one UPDATE below)
+            if sub.end_date < today:
+                expired_ids.append(sub.id)
                 continue
 
             job_id = f"sub_{sub.subscription_id}"
@@ -327,6 +360,14 @@ class SubscriptionService:
             )
             restored += 1
 
+        if expired_ids:
+            db.session.execute(
+                update(Subscription)
+                .where(Subscription.id.in_(expired_ids))
+                .values(active=False)
+            )
+            db.session.commit()
+
         logger.info(f"Restored {restored} active watch(es)")
 
     # Legacy compat — old routes may call these
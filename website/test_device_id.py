@@ -1,5 +1,7 @@
 import os
 import sys
+import uuid
+from datetime import date
 
 # Add the parent directory to sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -7,27 +9,32 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from website.app import app, db
 from website.models import SearchHistory
 
+# device_id is a UUID column; fixed IDs so repeated runs find the same rows
+TEST_DEVICE = uuid.uuid5(uuid.NAMESPACE_URL, 'test-device')
+OTHER_DEVICE = uuid.uuid5(uuid.NAMESPACE_URL, 'other-device')
+TEST_INSERT_DEVICE = uuid.uuid5(uuid.NAMESPACE_URL, 'test-insert-device')
+
 if __name__ == "__main__":
     with app.app_context():
-        # Get history for device_id='test-device'
-        history_records = SearchHistory.query.filter_by(device_id='test-device').all()
-        print(f"Found {len(history_records)} records for device_id='test-device'")
+        # Get history for the test device
+        history_records = SearchHistory.query.filter_by(device_id=TEST_DEVICE).all()
+        print(f"Found {len(history_records)} records for device_id={TEST_DEVICE}")
         
         # Print each record
         for record in history_records:
             print(f"ID: {record.id}, Park ID: {record.park_id}, Name: {record.park_name}")
             
         # Try with a different device ID
-        other_records = SearchHistory.query.filter_by(device_id='other-device').all()
-        print(f"Found {len(other_records)} records for device_id='other-device'")
+        other_records = SearchHistory.query.filter_by(device_id=OTHER_DEVICE).all()
+        print(f"Found {len(other_records)} records for device_id={OTHER_DEVICE}")
         
         # Insert a test record
         test_record = SearchHistory(
-            device_id='test-insert-device',
+            device_id=TEST_INSERT_DEVICE,
             park_id='999999',
             park_name='Test Insert Campground',
-            start_date='2025-08-01',
-            end_date='2025-08-05',
+            start_date=date(2025, 8, 1),
+            end_date=date(2025, 8, 5),
             nights=4,
             search_preference='all'
         )
@@ -36,5 +43,5 @@ if __name__ == "__main__":
         print(f"Inserted new record with ID: {test_record.id}")
         
         # Verify insertion
-        inserted_records = SearchHistory.query.filter_by(device_id='test-insert-device').all()
-        print(f"Found {len(inserted_records)} records for device_id='test-insert-device'") 
\ No newline at end of file
+        inserted_records = SearchHistory.query.filter_by(device_id=TEST_INSERT_DEVICE).all()
+        print(f"Found {len(inserted_records)} records for device_id={TEST_INSERT_DEVICE}") 
\ No newline at end of file
@@ -1,5 +1,6 @@
 import os
 import sys
+import uuid
 from datetime import date
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -7,16 +8,20 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from website.app import app, db
 from website.models import SearchHistory
 
+# device_id is a UUID column; fixed IDs so repeated runs find the same rows
+TEST_DEVICE = uuid.uuid5(uuid.NAMESPACE_URL, 'test-device')
+TEST_SIMPLE_DEVICE = uuid.uuid5(uuid.NAMESPACE_URL, 'test-simple')
+
 if __name__ == "__main__":
     with app.app_context():
-        records = SearchHistory.query.filter_by(device_id='test-device').all()
-        print(f"Found {len(records)} records with device_id='test-device'")
+        records = SearchHistory.query.filter_by(device_id=TEST_DEVICE).all()
+        print(f"Found {len(records)} records with device_id={TEST_DEVICE}")
         for r in records:
             print(f"  {r.id}: {r.park_id} - {r.park_name}")
             
         print("Adding a test record...")
         new_record = SearchHistory(
-            device_id='test-simple',
+            device_id=TEST_SIMPLE_DEVICE,
             park_id='777777',
             park_name='Simple Test Campground',
             start_date=date(2025, 7, 1),